@@ -0,0 +1,107 @@
+import datetime
+
+from .KWLStates import KWLState
+
+
+class AdaptivePollInterval:
+    """Chooses the next poll interval from the state of the device.
+
+    The device is polled with the minimal interval while something is going on
+    (intensive/individual timer running, CO2 rising, shortly after a write),
+    with the maximal interval while it is turned off, and otherwise with the
+    base interval which grows by backoffFactor for every poll without changes.
+    While the device is unreachable the next poll waits for the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        minInterval: datetime.timedelta,
+        maxInterval: datetime.timedelta,
+        baseInterval: datetime.timedelta = datetime.timedelta(seconds=60),
+        backoffFactor: float = 1.5,
+        co2RiseThreshold: int = 30,
+        afterWrite: datetime.timedelta = datetime.timedelta(minutes=2),
+    ) -> None:
+        self._minInterval = minInterval
+        self._maxInterval = maxInterval
+        self._baseInterval = min(max(baseInterval, minInterval), maxInterval)
+        self._backoffFactor = backoffFactor
+        self._co2RiseThreshold = co2RiseThreshold
+        self._afterWrite = afterWrite
+        self._interval = self._baseInterval
+        self._lastValues = None
+        self._lastCO2Value = None
+
+    def _isTransition(self, easyConnector, isPoll: bool) -> bool:
+        co2Value = easyConnector.CO2Value if easyConnector.HasCO2Sensor else None
+        lastCO2Value = self._lastCO2Value
+        if isPoll:
+            # also while a timer runs, a rise is measured from the last poll
+            self._lastCO2Value = co2Value
+
+        if easyConnector.instanceState in (KWLState.Intensive, KWLState.Individual):
+            return True
+
+        lastWrite = easyConnector.lastWrite
+        if (
+            lastWrite is not None
+            and datetime.datetime.now() - lastWrite < self._afterWrite
+        ):
+            return True
+
+        if not isPoll or co2Value is None or lastCO2Value is None:
+            return False
+        return co2Value - lastCO2Value >= self._co2RiseThreshold
+
+    def next(self, easyConnector, isPoll: bool = True) -> datetime.timedelta:
+        """Return the interval until the next poll after the values changed.
+
+        Only polls move the CO2 baseline and decide whether the values are
+        stable, changes in between (like written values) keep the interval
+        unless they start a transition or turn the device off.
+        """
+        values = (
+            easyConnector.instanceState,
+            easyConnector.IsOn,
+            easyConnector.CurrentFanSpeed,
+            easyConnector.AtHomeFanSpeed,
+            easyConnector.AwayFanSpeed,
+            easyConnector.IntensivFanSpeed,
+            easyConnector.OutsideTemperature,
+            easyConnector.SupplyTemperature,
+            easyConnector.IndoorTemperature,
+            easyConnector.ExhaustTemperature,
+            easyConnector.AirRH,
+            easyConnector.CO2Value,
+        )
+        isStable = values == self._lastValues
+        if isPoll:
+            self._lastValues = values
+
+        if self._isTransition(easyConnector, isPoll):
+            self._interval = self._minInterval
+        elif not easyConnector.IsOn:
+            self._interval = self._maxInterval
+        elif not isPoll:
+            pass
+        elif isStable:
+            self._interval = min(
+                max(self._interval, self._baseInterval) * self._backoffFactor,
+                self._maxInterval,
+            )
+        else:
+            self._interval = self._baseInterval
+
+        retryIn = easyConnector.retryIn
+        if retryIn is not None:
+            # polls before the breaker lets a request through would fail anyway
+            self._interval = min(
+                max(self._interval, datetime.timedelta(seconds=retryIn)),
+                self._maxInterval,
+            )
+
+        return self._interval
+
+    @property
+    def interval(self):
+        return self._interval
@@ -0,0 +1,133 @@
+"""Decodes many captured status frames at once, for analysing captures offline.
+
+Needs numpy, which is not a requirement of the integration itself. Run with:
+python -m custom_components.EasyControls3_homeassistant.BatchDecoder captures.txt
+where every line of captures.txt is a status frame in hex, the result is
+written as CSV to stdout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+
+from .RegisterMap import STATUS_DECODER, STATUS_REGISTERS
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exception:
+        raise ImportError(
+            "the batch decoder needs numpy (pip install numpy)"
+        ) from exception
+    return numpy
+
+
+def framesToArray(frames):
+    """Return the frames as 2-D uint8 array (one row per frame) and the rows long
+    enough.
+
+    Shorter frames are padded with zeros, their row is marked as not valid.
+    """
+    numpy = _numpy()
+    frames = list(frames)
+    lengths = {len(frame) for frame in frames}
+    if len(lengths) == 1 and min(lengths) >= STATUS_DECODER.frameSize:
+        # usually all frames have the same length, then no row has to be copied on its
+        # own
+        array = numpy.frombuffer(b"".join(frames), dtype=numpy.uint8).reshape(
+            len(frames), -1
+        )
+        return array, numpy.ones(len(frames), dtype=bool)
+
+    width = max([STATUS_DECODER.frameSize, *lengths])
+    array = numpy.zeros((len(frames), width), dtype=numpy.uint8)
+    valid = numpy.zeros(len(frames), dtype=bool)
+    for row, frame in enumerate(frames):
+        array[row, : len(frame)] = numpy.frombuffer(frame, dtype=numpy.uint8)
+        valid[row] = len(frame) >= STATUS_DECODER.frameSize
+    return array, valid
+
+
+def decodeArray(array, registers=STATUS_REGISTERS) -> dict:
+    """Decode the registers of all rows, returns a dict of register name to column."""
+    numpy = _numpy()
+    columns = {}
+    for register in registers:
+        dtype = numpy.dtype(f">{'i' if register.signed else 'u'}{register.width}")
+        raw = numpy.ascontiguousarray(
+            array[:, register.offset : register.offset + register.width]
+        ).view(dtype)[:, 0]
+        if register.isScaled:
+            value = raw / register.scale + register.bias
+            columns[register.name] = (
+                value
+                if register.precision is None
+                else numpy.round(value, register.precision)
+            )
+        else:
+            columns[register.name] = raw.astype(numpy.int64)
+    return columns
+
+
+def deriveColumns(columns: dict) -> dict:
+    """Add the values DeviceState derives: state, on/off and the filter dates."""
+    numpy = _numpy()
+    # KWLState values, the fireplace timer wins over the boost timer over the state
+    state = numpy.where(columns["CycleState"] != 0, 2, 1)
+    state = numpy.where(columns["BoostTimer"] != 0, 3, state)
+    state = numpy.where(columns["FireplaceTimer"] != 0, 4, state)
+
+    # the year is stored without the century, datetime64[Y] counts from 1970
+    months = numpy.clip(columns["FilterChangedMonth"], 1, 12)
+    monthStart = (columns["FilterChangedYear"] + 30).astype("datetime64[Y]") + (
+        months - 1
+    ).astype("timedelta64[M]")
+    filterChanged = monthStart.astype("datetime64[D]") + (
+        columns["FilterChangedDay"] - 1
+    ).astype("timedelta64[D]")
+    # dates datetime.date rejects (e.g. of padded frames) become NaT
+    isDateValid = (
+        (months == columns["FilterChangedMonth"])
+        & (columns["FilterChangedDay"] >= 1)
+        & (filterChanged.astype("datetime64[M]") == monthStart)
+    )
+    filterChanged = numpy.where(isDateValid, filterChanged, numpy.datetime64("NaT"))
+
+    return {
+        **columns,
+        "KWLState": state,
+        "IsOn": columns["CycleMode"] == 0,
+        "FilterChanged": filterChanged,
+        "FilterDue": filterChanged + columns["FilterInterval"].astype("timedelta64[D]"),
+    }
+
+
+def decodeFrames(frames) -> dict:
+    """Decode a list of status frames (bytes) into columns, one value per frame."""
+    array, valid = framesToArray(frames)
+    return {"valid": valid, **deriveColumns(decodeArray(array))}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "captures", type=argparse.FileType("r"), help="one hex frame per line"
+    )
+    arguments = parser.parse_args(arguments)
+
+    frames = [
+        bytes.fromhex(line.strip()) for line in arguments.captures if line.strip()
+    ]
+    columns = decodeFrames(frames)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(zip(*(column.tolist() for column in columns.values())))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
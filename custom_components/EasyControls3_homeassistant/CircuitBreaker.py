@@ -0,0 +1,76 @@
+import random
+import time
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of contacting a device which is known to be unreachable."""
+
+
+class CircuitBreaker:
+    """Stops contacting a device after repeated failures.
+
+    After failureThreshold failures in a row the circuit opens and every request
+    fails right away until the backoff delay is over, then a single request is
+    let through. If it fails too the delay is doubled (up to maxDelay), the delay
+    is varied by +-jitter so that several devices do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        failureThreshold: int = 3,
+        baseDelay: float = 5,
+        maxDelay: float = 300,
+        jitter: float = 0.2,
+        clock=time.monotonic,
+    ) -> None:
+        self._failureThreshold = failureThreshold
+        self._baseDelay = baseDelay
+        self._maxDelay = maxDelay
+        self._jitter = jitter
+        self._clock = clock
+        self._failures = 0
+        self._openUntil = None
+        self._trialRunning = False
+
+    def allowRequest(self) -> bool:
+        if self._openUntil is None:
+            return True
+        if self._trialRunning or self._clock() < self._openUntil:
+            return False
+        # half open, one request decides if the device is back
+        self._trialRunning = True
+        return True
+
+    def recordSuccess(self):
+        self._failures = 0
+        self._openUntil = None
+        self._trialRunning = False
+
+    def abortRequest(self):
+        """The request was cancelled, it neither counts as success nor as failure."""
+        self._trialRunning = False
+
+    def recordFailure(self):
+        self._failures += 1
+        self._trialRunning = False
+        if self._failures < self._failureThreshold:
+            return
+        exponent = self._failures - self._failureThreshold
+        delay = min(self._baseDelay * 2 ** min(exponent, 32), self._maxDelay)
+        delay *= 1 + random.uniform(-self._jitter, self._jitter)
+        self._openUntil = self._clock() + delay
+
+    @property
+    def isOpen(self):
+        return self._openUntil is not None
+
+    @property
+    def failures(self):
+        return self._failures
+
+    @property
+    def retryIn(self):
+        """Seconds until the next request is let through, None while closed."""
+        if self._openUntil is None:
+            return None
+        return max(0.0, self._openUntil - self._clock())
@@ -0,0 +1,56 @@
+"""One connection per device, shared by all config entries of its host."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ConnectionRegistry:
+    """Hands out one coordinator per host (with its instance, session and lock).
+
+    The coordinator is created by the first entry of a host and closed when the
+    last entry using it is unloaded, so two entries of the same device neither
+    open two connections nor poll it twice.
+    """
+
+    def __init__(self) -> None:
+        self._coordinators = {}
+        self._users = Counter()
+        self._locks = defaultdict(asyncio.Lock)
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    async def acquire(self, host: str, create):
+        """Return the coordinator of host, await create() makes it for a first user."""
+        key = self._key(host)
+        async with self._locks[key]:
+            coordinator = self._coordinators.get(key)
+            if coordinator is None:
+                # if create raises, nothing is registered
+                coordinator = await create()
+                self._coordinators[key] = coordinator
+            else:
+                LOGGER.debug(f"sharing the connection to {host}")
+            self._users[key] += 1
+            return coordinator
+
+    async def release(self, host: str, close):
+        """Give the coordinator of host back, await close(coordinator) for the last."""
+        key = self._key(host)
+        async with self._locks[key]:
+            self._users[key] -= 1
+            if self._users[key] > 0:
+                return
+            del self._users[key]
+            coordinator = self._coordinators.pop(key)
+            await close(coordinator)
+
+    @property
+    def isEmpty(self):
+        return not self._coordinators
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+
+from .DeviceState import DeviceState
+from .KWLStates import KWLState
+
+
+class DemandControl:
+    """Raises the fan speed of the AtHome mode while CO2 or humidity are high.
+
+    The demand starts when the CO2 value reaches co2High or the humidity rhHigh
+    and ends when both are back at co2Low and rhLow or below. The speed is only
+    changed in the AtHome mode while the device is on, at most once per
+    minInterval seconds, and the speed set before is restored when the demand
+    ends (unless it was changed by hand in between) or the demand control is
+    released.
+    """
+
+    def __init__(
+        self,
+        co2High: int = 1000,
+        co2Low: int = 800,
+        rhHigh: int = 70,
+        rhLow: int = 60,
+        demandFanSpeed: int = 80,
+        minInterval: float = 300,
+        clock=time.monotonic,
+    ) -> None:
+        self._co2High = co2High
+        self._co2Low = co2Low
+        self._rhHigh = rhHigh
+        self._rhLow = rhLow
+        self._demandFanSpeed = demandFanSpeed
+        self._minInterval = minInterval
+        self._clock = clock
+        self._isActive = False
+        self._normalFanSpeed = None  # AtHome speed to restore
+        self._raisedFanSpeed = None  # AtHome speed set for the demand
+        self._lastChange = None
+
+    def evaluate(self, state: DeviceState) -> int | None:
+        """Return the AtHome fan speed to set now, None to leave it as it is."""
+        if not state.isOn or state.instanceState is not KWLState.AtHome:
+            return None
+
+        co2Value = state.CO2Value if state.hasCO2Sensor else None
+        airRH = state.airRH
+        if not self._isActive:
+            if not (
+                (co2Value is not None and co2Value >= self._co2High)
+                or (airRH is not None and airRH >= self._rhHigh)
+            ):
+                return None
+        elif not (
+            (co2Value is None or co2Value <= self._co2Low)
+            and (airRH is None or airRH <= self._rhLow)
+        ):
+            return None
+
+        now = self._clock()
+        if self._lastChange is not None and now - self._lastChange < self._minInterval:
+            return None
+        self._lastChange = now
+
+        if not self._isActive:
+            self._isActive = True
+            if (
+                state.atHomeFanSpeed is not None
+                and state.atHomeFanSpeed >= self._demandFanSpeed
+            ):
+                # fast enough already, nothing to restore later
+                self._normalFanSpeed = None
+                return None
+            self._normalFanSpeed = state.atHomeFanSpeed
+            self._raisedFanSpeed = self._demandFanSpeed
+            return self._demandFanSpeed
+
+        return self.release(state)
+
+    def resume(self, normalFanSpeed: int, raisedFanSpeed: int):
+        """Continue a demand which raised the AtHome fan speed from normalFanSpeed.
+
+        E.g. a demand of before a restart.
+        """
+        self._isActive = True
+        self._normalFanSpeed = normalFanSpeed
+        self._raisedFanSpeed = raisedFanSpeed
+
+    def release(self, state: DeviceState) -> int | None:
+        """End the demand, return the AtHome fan speed to set back, None to leave it."""
+        self._isActive = False
+        normalFanSpeed = self._normalFanSpeed
+        raisedFanSpeed = self._raisedFanSpeed
+        self._normalFanSpeed = None
+        self._raisedFanSpeed = None
+        if normalFanSpeed is None or state.atHomeFanSpeed != raisedFanSpeed:
+            return None
+        return normalFanSpeed
+
+    @property
+    def isActive(self):
+        return self._isActive
+
+    @property
+    def raisedFanSpeeds(self) -> tuple[int, int] | None:
+        """(speed to restore, speed set) while a demand raised the AtHome fan speed."""
+        if self._normalFanSpeed is None:
+            return None
+        return self._normalFanSpeed, self._raisedFanSpeed
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import deque
+import itertools
+
+from .DeviceState import DeviceState
+
+
+class RollingWindow:
+    """Mean, minimum, maximum and rate of change of the samples of the last window
+    seconds.
+
+    Every sample is added and dropped once, the sum is kept running and the
+    minimum and maximum candidates are kept in monotonic deques, so adding a
+    sample is O(1) amortized.
+    """
+
+    def __init__(self, window: float) -> None:
+        self._window = window
+        self._samples = deque()  # (number, time, value)
+        self._sum = 0.0
+        self._minima = deque()  # increasing values
+        self._maxima = deque()  # decreasing values
+        self._numbers = itertools.count()
+
+    def add(self, timestamp: float, value: float):
+        sample = (next(self._numbers), timestamp, value)
+        self._samples.append(sample)
+        self._sum += value
+        while self._minima and self._minima[-1][2] >= value:
+            self._minima.pop()
+        self._minima.append(sample)
+        while self._maxima and self._maxima[-1][2] <= value:
+            self._maxima.pop()
+        self._maxima.append(sample)
+        self.expire(timestamp)
+
+    def expire(self, timestamp: float):
+        """Drop the samples which are older than the window at timestamp."""
+        while self._samples and self._samples[0][1] < timestamp - self._window:
+            number, _, oldValue = self._samples.popleft()
+            self._sum -= oldValue
+            if self._minima[0][0] == number:
+                self._minima.popleft()
+            if self._maxima[0][0] == number:
+                self._maxima.popleft()
+        if not self._samples:
+            # no rounding errors piling up
+            self._sum = 0.0
+
+    @property
+    def count(self):
+        return len(self._samples)
+
+    @property
+    def mean(self):
+        if not self._samples:
+            return None
+        return self._sum / len(self._samples)
+
+    @property
+    def minimum(self):
+        return self._minima[0][2] if self._minima else None
+
+    @property
+    def maximum(self):
+        return self._maxima[0][2] if self._maxima else None
+
+    @property
+    def rate(self):
+        """Change per minute between the oldest and the newest sample."""
+        if len(self._samples) < 2:
+            return None
+        _, firstTime, firstValue = self._samples[0]
+        _, lastTime, lastValue = self._samples[-1]
+        if lastTime <= firstTime:
+            return None
+        return (lastValue - firstValue) / (lastTime - firstTime) * 60
+
+
+class DerivedMetrics:
+    """Values calculated from the measurements of the device, updated per read.
+
+    The heat recovery efficiency is the share of the temperature difference
+    between indoor (extract) and outside air that is given to the supply air. It
+    is only calculated while the device is on and the difference is at least
+    minTemperatureDifference, below that the measuring error dominates.
+    """
+
+    def __init__(
+        self, window: float = 3600, minTemperatureDifference: float = 3.0
+    ) -> None:
+        self._minTemperatureDifference = minTemperatureDifference
+        self._lastTimestamp = None
+        self.heatRecoveryEfficiency = None
+        self.windows = {
+            "heatRecoveryEfficiency": RollingWindow(window),
+            "indoorTemperature": RollingWindow(window),
+            "airRH": RollingWindow(window),
+            "CO2Value": RollingWindow(window),
+        }
+
+    def _efficiency(self, state: DeviceState):
+        if (
+            not state.isOn
+            or state.outsideTemperature is None
+            or state.supplyTemperature is None
+            or state.indoorTemperature is None
+        ):
+            return None
+        difference = state.indoorTemperature - state.outsideTemperature
+        if abs(difference) < self._minTemperatureDifference:
+            return None
+        efficiency = (
+            (state.supplyTemperature - state.outsideTemperature) / difference * 100
+        )
+        return round(min(max(efficiency, 0.0), 100.0), 1)
+
+    def update(self, state: DeviceState, timestamp: float):
+        """Add the values of a read at timestamp (in seconds), once per read."""
+        if self._lastTimestamp is not None and timestamp <= self._lastTimestamp:
+            return
+        self._lastTimestamp = timestamp
+
+        for window in self.windows.values():
+            window.expire(timestamp)
+
+        self.heatRecoveryEfficiency = self._efficiency(state)
+        if self.heatRecoveryEfficiency is not None:
+            self.windows["heatRecoveryEfficiency"].add(
+                timestamp, self.heatRecoveryEfficiency
+            )
+        if state.indoorTemperature is not None:
+            self.windows["indoorTemperature"].add(timestamp, state.indoorTemperature)
+        if state.airRH is not None:
+            self.windows["airRH"].add(timestamp, state.airRH)
+        if state.hasCO2Sensor:
+            self.windows["CO2Value"].add(timestamp, state.CO2Value)
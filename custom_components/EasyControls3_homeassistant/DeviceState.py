@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import functools
+
+from .KWLStates import KWLState
+
+# reported as CO2 value by devices without a CO2 sensor
+NO_CO2_SENSOR = 0xFFFF
+
+
+@functools.lru_cache(maxsize=8)
+def deviceNames(deviceModel: int, deviceType: int):
+    """Return the names of a device model and type number."""
+    # the tables are only loaded once a device was read
+    from .deviceList import deviceInfo
+
+    return (
+        deviceInfo["device_model_data"][deviceModel],
+        deviceInfo["device_type_data"][deviceType],
+    )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DeviceState:
+    """The values of a device at one point in time.
+
+    A new DeviceState is created for every update and replaces the previous one
+    as a whole, so readers never see values of two different updates. The
+    generation is increased with every update.
+    """
+
+    generation: int = 0
+    timestamp: datetime.datetime | None = None
+    deviceModel: str | None = None
+    deviceType: str | None = None
+    serialNR: int | None = None
+    instanceState: KWLState | None = None
+    currentFanSpeed: int | None = None
+    atHomeFanSpeed: int | None = None
+    awayFanSpeed: int | None = None
+    intensivFanSpeed: int | None = None
+    intensivDuration: datetime.time | None = None
+    outsideTemperature: float | None = None
+    supplyTemperature: float | None = None
+    indoorTemperature: float | None = None
+    exhaustTemperature: float | None = None
+    airRH: int | None = None
+    filterInterval: int | None = None
+    filterChanged: datetime.date | None = None
+    filterDue: datetime.date | None = None
+    isOn: bool = True
+    CO2Value: int | None = None
+
+    @property
+    def hasCO2Sensor(self) -> bool:
+        return self.CO2Value is not None and self.CO2Value != NO_CO2_SENSOR
+
+    @classmethod
+    def fromValues(cls, values: dict, generation: int) -> DeviceState:
+        """Derive the state from the decoded registers (see RegisterMap)."""
+        deviceModel, deviceType = deviceNames(
+            values["DeviceModel"], values["DeviceType"]
+        )
+
+        # the status is calculated from A_CYC_STATE, A_CYC_FIREPLACE_TIMER and
+        # A_CYC_BOOST_TIMER:
+        # IF fireplace timer is 0 and boost timer is 0 and state is 0 => 0
+        # IF fireplace timer is not 0 => 3
+        # IF boost timer is not 0 => 2
+        # IF state is not 0 => 1
+        # eq: a = 0 == u ? 0 == v ? 0 == Y ? 0 : 1 : 2 : 3
+        instanceState = KWLState.AtHome
+        instanceState = KWLState.Away if values["CycleState"] != 0 else instanceState
+        instanceState = (
+            KWLState.Intensive if values["BoostTimer"] != 0 else instanceState
+        )
+        instanceState = (
+            KWLState.Individual if values["FireplaceTimer"] != 0 else instanceState
+        )
+
+        # filter
+        filterChanged = datetime.date(
+            2000 + values["FilterChangedYear"],
+            values["FilterChangedMonth"],
+            values["FilterChangedDay"],
+        )
+        filterDue = filterChanged + datetime.timedelta(
+            days=int(values["FilterInterval"])
+        )
+
+        # duration, 24h (the maximum) does not fit into a time
+        intensivDurationHours, intensivDurationMinutes = divmod(
+            min(values["IntensivDuration"], 23 * 60 + 59), 60
+        )
+
+        return cls(
+            generation=generation,
+            timestamp=datetime.datetime.now(),
+            deviceModel=deviceModel,
+            deviceType=deviceType,
+            serialNR=values["SerialNR"],
+            instanceState=instanceState,
+            currentFanSpeed=values["CurrentFanSpeed"],
+            atHomeFanSpeed=values["AtHomeFanSpeed"],
+            awayFanSpeed=values["AwayFanSpeed"],
+            intensivFanSpeed=values["IntensivFanSpeed"],
+            intensivDuration=datetime.time(
+                intensivDurationHours, intensivDurationMinutes
+            ),
+            outsideTemperature=values["OutsideTemperature"],
+            supplyTemperature=values["SupplyTemperature"],
+            indoorTemperature=values["IndoorTemperature"],
+            exhaustTemperature=values["ExhaustTemperature"],
+            airRH=values["AirRH"],
+            filterInterval=values["FilterInterval"],
+            filterChanged=filterChanged,
+            filterDue=filterDue,
+            isOn=values["CycleMode"] == 0,
+            CO2Value=values["CO2Value"],
+        )
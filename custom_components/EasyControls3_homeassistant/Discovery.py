@@ -0,0 +1,91 @@
+"""Finds EasyControls 3 devices in a network."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from typing import NamedTuple
+
+from .DeviceState import deviceNames
+from .EasyControls3Session import EasyControls3Session
+from .FrameEncoder import READ_STATUS_FRAME
+from .RegisterMap import STATUS_DECODER
+
+LOGGER = logging.getLogger(__name__)
+
+# a /22, larger networks take too long to scan from a config flow
+MAX_HOSTS = 1024
+
+
+class DiscoveredDevice(NamedTuple):
+    host: str
+    serialNR: int
+    deviceModel: str
+    deviceType: str
+
+
+def identifyDevice(host: str, response) -> DiscoveredDevice | None:
+    """Return the device if response is a status frame of an EasyControls 3 device."""
+    if not isinstance(response, bytes) or len(response) < STATUS_DECODER.frameSize:
+        return None
+    values = STATUS_DECODER.decodeRegisters(
+        response, ("SerialNR", "DeviceModel", "DeviceType")
+    )
+    try:
+        deviceModel, deviceType = deviceNames(
+            values["DeviceModel"], values["DeviceType"]
+        )
+    except IndexError:
+        return None
+    return DiscoveredDevice(host, values["SerialNR"], deviceModel, deviceType)
+
+
+async def probe(
+    host: str, port: int = 80, timeout: float = 1.0
+) -> DiscoveredDevice | None:
+    """Read the status frame of host once, None if it is no EasyControls 3 device.
+
+    Gives up after timeout seconds.
+    """
+    # a new connection is not retried, a host which does not answer in time is skipped
+    session = EasyControls3Session(
+        f"ws://{host}:{port}", connectTimeout=timeout, responseTimeout=timeout
+    )
+    try:
+        # timeout is for the connection and the answer together
+        async with asyncio.timeout(timeout):
+            response = await session.exchange(READ_STATUS_FRAME)
+    except Exception as exception:
+        # nothing listening, a timeout or e.g. a web server rejecting the handshake
+        LOGGER.debug(f"no device at {host} ({exception!r})")
+        return None
+    finally:
+        await session.close()
+    return identifyDevice(host, response)
+
+
+async def discoverDevices(
+    network: str, port: int = 80, maxConcurrentProbes: int = 64, timeout: float = 1.0
+) -> list[DiscoveredDevice]:
+    """Probe all hosts of network (e.g. 192.168.1.0/24) and return the devices found.
+
+    At most maxConcurrentProbes hosts are probed at the same time, each probe
+    gives up after timeout seconds. Raises ValueError for an invalid or too
+    large network.
+    """
+    network = ipaddress.IPv4Network(network, strict=False)
+    if network.num_addresses > MAX_HOSTS:
+        raise ValueError(f"{network} has more than {MAX_HOSTS} addresses")
+    hosts = list(network.hosts())
+
+    semaphore = asyncio.Semaphore(maxConcurrentProbes)
+
+    async def limitedProbe(host):
+        async with semaphore:
+            return await probe(str(host), port, timeout)
+
+    results = await asyncio.gather(*(limitedProbe(host) for host in hosts))
+    devices = [device for device in results if device is not None]
+    LOGGER.debug(f"found {len(devices)} devices in {network}")
+    return devices
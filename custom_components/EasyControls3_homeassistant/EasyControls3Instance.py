@@ -1,176 +1,466 @@
 import asyncio
 import datetime
 import logging
-import math
-
-from dateutil.relativedelta import relativedelta
-from websockets.asyncio.client import connect
-
-from .Conversions import dataToCelsius
-from .deviceList import deviceInfo
+import time
+
+from .DemandControl import DemandControl
+from .DeviceState import DeviceState
+from .EasyControls3Session import EasyControls3Session
+from .FrameEncoder import (
+    A_CYC_AWAY_SPEED_SETTING,
+    A_CYC_BOOST_SPEED_SETTING,
+    A_CYC_BOOST_TIME,
+    A_CYC_BOOST_TIMER,
+    A_CYC_FIREPLACE_TIMER,
+    A_CYC_HOME_SPEED_SETTING,
+    A_CYC_MODE,
+    A_CYC_STATE,
+    ACKNOWLEDGE_FRAME,
+    READ_STATUS_FRAME,
+    encodeWriteFrame,
+)
 from .KWLStates import KWLState
+from .RegisterMap import REGISTERS_BY_ADDRESS, STATUS_DECODER
 
 LOGGER = logging.getLogger(__name__)
 
+# the original app never sends more than three registers in one frame, do the same
+MAX_WRITES_PER_FRAME = 3
+
+
+class SettingsNotAppliedError(Exception):
+    """A settings profile was not applied as a whole."""
+
+    def __init__(self, message, registers) -> None:
+        super().__init__(message)
+        self.registers = registers  # names of the registers concerned
+
+
+def _isStatusFrame(response):
+    return isinstance(response, bytes) and len(response) >= STATUS_DECODER.frameSize
+
+
+def _isAcknowledge(response):
+    return response == ACKNOWLEDGE_FRAME
+
+
+def _isWritten(register, deviceValue, value):
+    """Whether the device reports the value written to register."""
+    # the device starts counting down timers right away
+    if register.isCounter:
+        return bool(deviceValue) == bool(value)
+    return deviceValue == value
+
 
 class EasyControls3Instance:
-    def __init__(self, url: str) -> None:
-        self._lock = asyncio.Lock()
-        self._url = "ws://" + url + ":80"
-        self._deviceModel = None
-        self._deviceType = None
-        self._SerialNR = None
-        self._instanceState = None
-        self._CurrentFanSpeed = None
-        self._intensivFanSpeed = None
-        self._atHomeFanSpeed = None
-        self._awayFanSpeed = None
-        self._intensivDuration = None
-        self._OutsideTemperature = None
-        self._SupplyTemperature = None
-        self._IndoorTemperature = None
-        self._ExhaustTemperature = None
-        self._AirRH = None
-        self._filterInterval = None
-        self._filterChanged = None
-        self._filterDue = None
+    def __init__(
+        self, url: str, writeCoalesceWindow: float = 0.5, port: int = 80
+    ) -> None:
+        self._url = "ws://" + url + ":" + str(port)
+        self._session = EasyControls3Session(self._url)
+        self._writeCoalesceWindow = writeCoalesceWindow
+        self._pendingWrites = {}
+        self._pendingWritesDone = None
+        self._inFlightWrites = []  # writes which are sent but not read back yet
+        self._flushTask = None
+        self._values = None  # last values read from the device
+        self._lastFrame = None
+        # refresh period -> (frame the registers were last checked in, monotonic time)
+        self._checkedFrames = {}
+        self._changedRegisters = None  # names changed by the last update, None for all
+        self._optimisticValues = {}  # written values which were not read back yet
+        self._stateListeners = []
+        self._settingsLock = asyncio.Lock()
+        self._state = DeviceState()
         self._sthModified = False
         self._lastUpdate = None
+        self._lastWrite = None
         self._minSecondsBetweenRead = 60
         self._isAvailable = True
         self._offlineAfter = datetime.timedelta(minutes=10)
-        self._isOn = True
-        self._CO2Value = None
-
-    async def _exchangeData(self, request):
-        async with self._lock, connect(self._url) as websocket:
-            LOGGER.debug("connected")
-            # request current data package
-            await websocket.send(request)
-            LOGGER.debug("sent")
-            response = await websocket.recv()
-            return response
-
-    async def readCurrentData(self):
+        self._failedReads = 0
+        self._lastErrorLog = None
+        self._errorLogInterval = datetime.timedelta(minutes=10)
+        self._demandControl = None
+        self._demandControlGeneration = None
+        self._demandControlTask = None
+        # a demand of before the restart whose fan speed is set back after the next read
+        self._releasedDemandControl = None
+
+    async def _exchangeData(self, request, isExpected=None, strict=True):
+        return await self._session.exchange(request, isExpected, strict)
+
+    async def close(self):
+        if self._demandControlTask is not None:
+            await asyncio.gather(self._demandControlTask, return_exceptions=True)
+        await self._releaseDemandControl()
+        if self._flushTask is not None:
+            # send what is still queued before the connection goes away
+            await asyncio.gather(self._flushTask, return_exceptions=True)
+        await self._session.close()
+
+    async def readCurrentData(self, force: bool = False):
         if (
-            self._lastUpdate is None
+            force
+            or self._lastUpdate is None
             or (datetime.datetime.now() - self._lastUpdate).total_seconds()
             > self._minSecondsBetweenRead
             or self._sthModified
         ):
+            wasAvailable = self._isAvailable
             try:
-                request = bytes.fromhex("0300f6000000f900")
-                response = await self._exchangeData(request)
+                response = await self._exchangeData(READ_STATUS_FRAME, _isStatusFrame)
                 self._parseData(response)
                 self._isAvailable = True
                 self._lastUpdate = datetime.datetime.now()
                 self._sthModified = False
+                if self._failedReads:
+                    LOGGER.info(
+                        f"{self._url} is reachable again after "
+                        f"{self._failedReads} failed reads"
+                    )
+                    self._failedReads = 0
+                self._evaluateDemandControl()
             except Exception as exception:
-                LOGGER.error(f"error in reading ({exception})")
-                if datetime.datetime.now() - self._lastUpdate > self._offlineAfter:
+                self._changedRegisters = frozenset()
+                self._logReadError(exception)
+                if (
+                    self._lastUpdate is None
+                    or datetime.datetime.now() - self._lastUpdate > self._offlineAfter
+                ):
                     self._isAvailable = False
 
-    def _parseData(self, data):
-        # device info
-        self._deviceModel = deviceInfo["device_model_data"][data[17 * 2 + 1]]
-        self._deviceType = deviceInfo["device_type_data"][data[16 * 2 + 1]]
-        self._SerialNR = (
-            data[14 * 2] * 16777216
-            + data[14 * 2 + 1] * 65536
-            + data[15 * 2] * 256
-            + data[15 * 2 + 1]
-        )
-
-        # state
-        # current device state - we need A_CYC_STATE (Y), A_CYC_FIREPLACE_TIMER (u), A_CYC_BOOST_TIMER (v)
-        # offsets: 107, 111, 110
-        # the status is calculated:
-        # IF fireplace timer is 0 and boost timer is 0 and state is 0 => 0
-        # IF fireplace timer is not 0 => 3
-        # IF boost timer is not 0 => 2
-        # IF state is not 0 => 1
-        # eq: a = 0 == u ? 0 == v ? 0 == Y ? 0 : 1 : 2 : 3
-        state = data[107 * 2 + 1]
-        fire = data[111 * 2 + 1]
-        boost = data[110 * 2 + 1]
-        tmpState = KWLState.AtHome
-        tmpState = KWLState.Away if state != 0 else tmpState
-        tmpState = KWLState.Intensive if boost != 0 else tmpState
-        tmpState = KWLState.Individual if fire != 0 else tmpState
-        self._instanceState = tmpState
-
-        # fan
-        self._CurrentFanSpeed = data[129]
-        self._intensivFanSpeed = data[431]
-        self._atHomeFanSpeed = data[419]
-        self._awayFanSpeed = data[407]
-
-        # temperatures
-        self._OutsideTemperature = dataToCelsius(data, 67)
-        self._SupplyTemperature = dataToCelsius(data, 69)
-        self._IndoorTemperature = dataToCelsius(data, 65)
-        self._ExhaustTemperature = dataToCelsius(data, 66)
-
-        # humidity
-        self._AirRH = data[74 * 2 + 1]
-
-        # filter
-        self._filterInterval = data[239 * 2 + 1]  # a month at helios has 30 days
-        lastFilterChangedYear = 2000 + data[250 * 2 + 1]
-        lastFilterChangedMonth = data[249 * 2 + 1]
-        lastFilterChangedDay = data[248 * 2 + 1]
-        self._filterChanged = datetime.date(
-            lastFilterChangedYear, lastFilterChangedMonth, lastFilterChangedDay
-        )
-        self._filterDue = self._filterChanged + relativedelta(
-            days=+int(self._filterInterval)
-        )
+            if self._isAvailable != wasAvailable:
+                # all entities have to show the new availability
+                self._changedRegisters = None
+
+    def _logReadError(self, exception):
+        """Log the first failed read, then one summary per interval while it fails."""
+        self._failedReads += 1
+        now = datetime.datetime.now()
+        if self._failedReads == 1:
+            LOGGER.error(f"error in reading ({exception})")
+            self._lastErrorLog = now
+        elif now - self._lastErrorLog >= self._errorLogInterval:
+            LOGGER.error(
+                f"still unable to read from {self._url}, "
+                f"{self._failedReads} failed reads ({exception})"
+            )
+            self._lastErrorLog = now
+        else:
+            LOGGER.debug(f"error in reading ({exception})")
 
-        # duration
-        intensivDurationInMinutes = data[493]
-        intensivDurationHours = math.floor(intensivDurationInMinutes / 60)
-        intensivDurationMinutes = intensivDurationInMinutes - 60 * intensivDurationHours
+    def setDemandControl(self, demandControl):
+        """Let demandControl (see DemandControl) adjust the fan speed after every read.
 
-        self._intensivDuration = datetime.time(
-            intensivDurationHours, intensivDurationMinutes
-        )
+        None stops it.
+        """
+        self._demandControl = demandControl
+        self._demandControlGeneration = None
 
-        # on off state
-        # value_if_true if condition else value_if_false
-        self._isOn = bool(data[217] == 0)
+    def resumeDemandControl(self, normalFanSpeed: int, raisedFanSpeed: int):
+        """Continue a demand which raised the AtHome fan speed before a restart.
 
-        # CO2 value
-        self._CO2Value = int(data[182]) << 8 | int(data[183])
+        Without a demand control (it was turned off meanwhile) the speed is set
+        back after the next read.
+        """
+        if self._demandControl is not None:
+            self._demandControl.resume(normalFanSpeed, raisedFanSpeed)
+            return
+        self._releasedDemandControl = DemandControl()
+        self._releasedDemandControl.resume(normalFanSpeed, raisedFanSpeed)
 
-    async def switchMode(self, wantedKWLState):
-        if wantedKWLState is KWLState.AtHome:
-            requestData = "0800f9000112000004120000051200000b37"
-        elif wantedKWLState is KWLState.Away:
-            requestData = "0800f9000112010004120000051200000c37"
-        elif wantedKWLState is KWLState.Intensive:
-            requestedDuration = (
-                self.IntensivDuration.hour * 60 + self.IntensivDuration.minute
+    @property
+    def demandRaisedFanSpeeds(self):
+        """(speed to restore, speed set) while a demand raised the AtHome fan speed.
+
+        See DemandControl.
+        """
+        demandControl = self._demandControl or self._releasedDemandControl
+        return None if demandControl is None else demandControl.raisedFanSpeeds
+
+    async def _releaseDemandControl(self):
+        # the fan speed must not stay raised while nothing will lower it again
+        demandControl = self._demandControl or self._releasedDemandControl
+        if demandControl is None or self._values is None:
+            return
+        fanSpeed = demandControl.release(self._state)
+        if fanSpeed is not None:
+            LOGGER.debug(f"demand control sets the AtHome fan speed back to {fanSpeed}")
+            await self._setDemandFanSpeed(fanSpeed)
+
+    def _evaluateDemandControl(self):
+        if self._releasedDemandControl is not None:
+            fanSpeed = self._releasedDemandControl.release(self._state)
+            self._releasedDemandControl = None
+            if fanSpeed is not None:
+                LOGGER.debug(
+                    f"setting the AtHome fan speed back to {fanSpeed} after a demand"
+                )
+                self._demandControlTask = asyncio.get_running_loop().create_task(
+                    self._setDemandFanSpeed(fanSpeed)
+                )
+            return
+        # once per new state, the fan speed is set in the background to not delay the
+        # poll
+        if (
+            self._demandControl is None
+            or self._state.generation == self._demandControlGeneration
+            or (
+                self._demandControlTask is not None
+                and not self._demandControlTask.done()
             )
-            requestData = (
-                "0600f9000412"
-                + (requestedDuration).to_bytes(2, byteorder="little").hex()
-                + "05120000"
-                + (requestedDuration + 0x2508).to_bytes(2, byteorder="little").hex()
+        ):
+            return
+        self._demandControlGeneration = self._state.generation
+        fanSpeed = self._demandControl.evaluate(self._state)
+        if fanSpeed is not None:
+            LOGGER.debug(f"demand control sets the AtHome fan speed to {fanSpeed}")
+            self._demandControlTask = asyncio.get_running_loop().create_task(
+                self._setDemandFanSpeed(fanSpeed)
             )
-        elif wantedKWLState is KWLState.Individual:
-            requestData = "0600f90004120000051296009e25"
-        else:
-            raise TypeError("direction must be an instance of Direction Enum")
 
-        request = bytes.fromhex(requestData)
-        response = await self._exchangeData(request)
+    async def _setDemandFanSpeed(self, fanSpeed):
+        try:
+            await self.setAtHomeFanSpeed(fanSpeed)
+        except Exception as exception:
+            LOGGER.warning(f"demand control could not set the fan speed ({exception})")
+
+    def restoreFrame(self, data):
+        """Show the values of a frame read before, until the device is read again."""
+        self._parseData(data)
+        # the device may have changed meanwhile, the next read decodes all registers
+        self._checkedFrames = {}
+
+    def addStateListener(self, listener):
+        """Call listener() whenever the values change outside of readCurrentData."""
+        self._stateListeners.append(listener)
+        return lambda: self._stateListeners.remove(listener)
+
+    def _notifyStateListeners(self):
+        for listener in list(self._stateListeners):
+            listener()
 
-        if bytes.fromhex("0200f500f700") == response:
-            LOGGER.debug("expected response")
+    def _parseData(self, data):
+        data = bytes(data)
+        now = time.monotonic()
+        if (
+            self._values is None
+            or not self._checkedFrames
+            or len(data) != len(self._lastFrame)
+        ):
+            self._values = STATUS_DECODER.decode(data)
+            self._checkedFrames = dict.fromkeys(
+                STATUS_DECODER.refreshPeriods, (data, now)
+            )
+            changed = None
         else:
-            LOGGER.debug("unexpected response")
+            # only decode the registers whose bytes changed since they were checked,
+            # registers with a refresh period are not checked in every frame
+            changed = frozenset()
+            for period, (checkedFrame, checkedAt) in self._checkedFrames.items():
+                if period and now - checkedAt < period:
+                    continue
+                changed |= STATUS_DECODER.changedRegisters(data, checkedFrame, period)
+                self._checkedFrames[period] = (data, now)
+            if changed:
+                self._values.update(STATUS_DECODER.decodeRegisters(data, changed))
+        self._lastFrame = data
+
+        # a full read confirms or overrules all writes which are already read back,
+        # the frame may be older than a write which is still on its way
+        pendingAddresses = set(self._pendingWrites)
+        for writes in self._inFlightWrites:
+            pendingAddresses.update(address for address, _ in writes)
+        pendingNames = {
+            REGISTERS_BY_ADDRESS[address].name
+            for address in pendingAddresses
+            if address in REGISTERS_BY_ADDRESS
+        }
+        droppedNames = self._optimisticValues.keys() - pendingNames
+        if droppedNames:
+            self._optimisticValues = {
+                name: value
+                for name, value in self._optimisticValues.items()
+                if name in pendingNames
+            }
+            if changed is not None:
+                changed = changed | droppedNames
+
+        self._changedRegisters = changed
+        if changed is None or changed:
+            self._applyValues()
+
+    def registerValue(self, name):
+        """Value of a status register, None if it is not known."""
+        if name in self._optimisticValues:
+            return self._optimisticValues[name]
+        return None if self._values is None else self._values.get(name)
+
+    def _applyValues(self):
+        values = self._values
+        if self._optimisticValues:
+            values = {**values, **self._optimisticValues}
+        # replaced as a whole, readers see either the old or the new values
+        self._state = DeviceState.fromValues(values, self._state.generation + 1)
+
+    async def writeRegisters(self, writes):
+        """Write ((address, value), ...) to the device in one frame."""
+        request = encodeWriteFrame(tuple(writes))
+        # a write without the ACK is no failure of the device, the read back tells
+        # whether the values were taken
+        await self._exchangeData(request, _isAcknowledge, strict=False)
+
+    async def _writeInFrames(self, writes, written=None):
+        """Write ((address, value), ...) in frames of MAX_WRITES_PER_FRAME registers.
+
+        The writes of each acknowledged frame are added to written.
+        """
+        for index in range(0, len(writes), MAX_WRITES_PER_FRAME):
+            frame = writes[index : index + MAX_WRITES_PER_FRAME]
+            await self.writeRegisters(frame)
+            if written is not None:
+                written.extend(frame)
+
+    def _setOptimisticValues(self, writes):
+        changed = set()
+        for address, value in writes:
+            register = REGISTERS_BY_ADDRESS.get(address)
+            if register is not None:
+                self._optimisticValues[register.name] = value
+                changed.add(register.name)
+        self._changedRegisters = frozenset(changed)
+
+        if self._values is not None:
+            self._applyValues()
+            self._notifyStateListeners()
+
+    def _dropOptimisticValues(self, writes, deviceValues):
+        """Replace the written values with the values of the device."""
+        changed = set()
+        for address, value in writes:
+            register = REGISTERS_BY_ADDRESS.get(address)
+            if register is None:
+                continue
+            changed.add(register.name)
+            if register.name in deviceValues:
+                self._values[register.name] = deviceValues[register.name]
+            # a newer value may be queued already
+            if self._optimisticValues.get(register.name) == value:
+                del self._optimisticValues[register.name]
+
+        self._changedRegisters = frozenset(changed)
+        self._applyValues()
+        self._notifyStateListeners()
+
+    async def _verifyWrites(self, writes):
+        """Read back the written registers, the device value wins if they differ."""
+        registers = {
+            REGISTERS_BY_ADDRESS[address]: value
+            for address, value in writes
+            if address in REGISTERS_BY_ADDRESS
+        }
+        if not registers or self._values is None:
+            return
 
-        self._sthModified = True
+        try:
+            response = await self._exchangeData(READ_STATUS_FRAME, _isStatusFrame)
+            deviceValues = STATUS_DECODER.decodeRegisters(
+                response, [register.name for register in registers]
+            )
+        except Exception as exception:
+            # keep the written values until the next read
+            LOGGER.warning(f"error in reading back written values ({exception})")
+            self._sthModified = True
+            return
+
+        for register, value in registers.items():
+            deviceValue = deviceValues[register.name]
+            if not _isWritten(register, deviceValue, value):
+                LOGGER.warning(
+                    f"{register.name} was written as {value} "
+                    f"but the device reports {deviceValue}"
+                )
+
+        self._dropOptimisticValues(writes, deviceValues)
+
+    async def queueRegisterWrites(self, writes):
+        """Write ((address, value), ...) with the other writes of the coalesce window.
+
+        All writes queued within the window are sent together, if a register is
+        written more than once only the last value is sent. Returns after the
+        writes were sent (and raises if sending failed).
+        """
+        for address, value in writes:
+            self._pendingWrites[address] = value
+        self._lastWrite = datetime.datetime.now()
+        self._setOptimisticValues(writes)
+
+        if self._pendingWritesDone is None:
+            loop = asyncio.get_running_loop()
+            self._pendingWritesDone = loop.create_future()
+            self._flushTask = loop.create_task(self._flushWritesLater())
+
+        await asyncio.shield(self._pendingWritesDone)
+
+    async def _flushWritesLater(self):
+        await asyncio.sleep(self._writeCoalesceWindow)
+        await self.flushWrites()
+
+    async def flushWrites(self):
+        """Send all queued writes now."""
+        if self._pendingWritesDone is None:
+            return
+
+        writes = tuple(self._pendingWrites.items())
+        done = self._pendingWritesDone
+        self._pendingWrites = {}
+        self._pendingWritesDone = None
+
+        LOGGER.debug(f"sending {len(writes)} queued register writes")
+        self._inFlightWrites.append(writes)
+        try:
+            try:
+                await self._writeInFrames(writes)
+            except asyncio.CancelledError:
+                done.cancel()
+                raise
+            except Exception as exception:
+                if self._values is not None:
+                    self._dropOptimisticValues(writes, {})
+                done.set_exception(exception)
+                return
+
+            done.set_result(None)
+            await self._verifyWrites(writes)
+        finally:
+            self._inFlightWrites.remove(writes)
+
+    def _modeWrites(self, wantedKWLState, intensiveDuration=None):
+        if wantedKWLState is KWLState.AtHome:
+            return (
+                (A_CYC_STATE, 0),
+                (A_CYC_BOOST_TIMER, 0),
+                (A_CYC_FIREPLACE_TIMER, 0),
+            )
+        if wantedKWLState is KWLState.Away:
+            return (
+                (A_CYC_STATE, 1),
+                (A_CYC_BOOST_TIMER, 0),
+                (A_CYC_FIREPLACE_TIMER, 0),
+            )
+        if wantedKWLState is KWLState.Intensive:
+            if intensiveDuration is None:
+                intensiveDuration = (
+                    self.IntensivDuration.hour * 60 + self.IntensivDuration.minute
+                )
+            return ((A_CYC_BOOST_TIMER, intensiveDuration), (A_CYC_FIREPLACE_TIMER, 0))
+        if wantedKWLState is KWLState.Individual:
+            return ((A_CYC_BOOST_TIMER, 0), (A_CYC_FIREPLACE_TIMER, 150))
+        raise TypeError("direction must be an instance of Direction Enum")
+
+    async def switchMode(self, wantedKWLState):
+        await self.queueRegisterWrites(self._modeWrites(wantedKWLState))
 
     def checkFanSpeedLimit(self, requestedFanSpeed: int):
         if requestedFanSpeed < 1:
@@ -181,70 +471,20 @@ class EasyControls3Instance:
             requestedFanSpeed = round(requestedFanSpeed)
         return requestedFanSpeed
 
-    def createFanSpeedPlainRequestString(self, requestedFanSpeed: int):
-        return (
-            f"{requestedFanSpeed:x}"
-            if len(f"{requestedFanSpeed:x}") == 2
-            else ("0" + f"{requestedFanSpeed:x}")
-        )  # needs to be 1byte, 2 nibble long
-
-    def createFanSpeedModdedRequestString(self, requestedFanSpeed: int, mode: KWLState):
-        offset = 30  # Intensive
-
-        if mode is KWLState.AtHome:
-            offset = 24
-        elif mode is KWLState.Away:
-            offset = 18
-        elif mode is KWLState.Intensive:
-            offset = 30
-        else:  # Individual/Fireplace should not be changed from here
-            LOGGER.debug("Individual/Fireplace is not supported")
-
-        return (
-            f"{requestedFanSpeed + offset :x}"
-            if len(f"{requestedFanSpeed + offset :x}") == 2
-            else ("0" + f"{requestedFanSpeed + offset :x}")
-        )  # needs to be 1byte, 2 nibble long
-
     async def setFanSpeed(self, requestedFanSpeed: int, mode: KWLState):
         requestedFanSpeed = self.checkFanSpeedLimit(requestedFanSpeed)
-        requestedSpeedPlainString = self.createFanSpeedPlainRequestString(
-            requestedFanSpeed
-        )
-        requestedSpeedModdedString = self.createFanSpeedModdedRequestString(
-            requestedFanSpeed, mode
-        )
-
-        modeIdentifier = "21"  # Intensive
 
         if mode is KWLState.AtHome:
-            modeIdentifier = "1B"
+            address = A_CYC_HOME_SPEED_SETTING
         elif mode is KWLState.Away:
-            modeIdentifier = "15"
+            address = A_CYC_AWAY_SPEED_SETTING
         elif mode is KWLState.Intensive:
-            modeIdentifier = "21"
+            address = A_CYC_BOOST_SPEED_SETTING
         else:  # Individual/Fireplace should not be changed from here
             LOGGER.debug("Individual/Fireplace is not supported")
             return
 
-        requestData = (
-            "04 00 f9 00"
-            + modeIdentifier
-            + "50"
-            + requestedSpeedPlainString
-            + "00"
-            + requestedSpeedModdedString
-            + "51"
-        )
-
-        request = bytes.fromhex(requestData)
-        response = await self._exchangeData(request)
-        if bytes.fromhex("0200f500f700") == response:
-            LOGGER.debug("expected response")
-        else:
-            LOGGER.debug("unexpected response")
-
-        self._sthModified = True
+        await self.queueRegisterWrites(((address, requestedFanSpeed),))
 
     async def setIntensiveFanSpeed(self, requestedFanSpeed: int):
         await self.setFanSpeed(requestedFanSpeed, KWLState.Intensive)
@@ -255,7 +495,7 @@ class EasyControls3Instance:
     async def setAwayFanSpeed(self, requestedFanSpeed: int):
         await self.setFanSpeed(requestedFanSpeed, KWLState.Away)
 
-    async def setIntensiveDuration(self, requestedDurationTime: datetime.time):
+    def checkDurationLimit(self, requestedDurationTime: datetime.time):
         requestedDuration = (
             requestedDurationTime.hour * 60 + requestedDurationTime.minute
         )
@@ -267,115 +507,231 @@ class EasyControls3Instance:
             requestedDuration = 0x5A0
         else:
             requestedDuration = round(requestedDuration)
+        return requestedDuration
 
-        requestData = (
-            "0400f9004050"
-            + (requestedDuration).to_bytes(2, byteorder="little").hex()
-            + (requestedDuration + 0x513D).to_bytes(2, byteorder="little").hex()
+    async def setIntensiveDuration(self, requestedDurationTime: datetime.time):
+        requestedDuration = self.checkDurationLimit(requestedDurationTime)
+        await self.queueRegisterWrites(((A_CYC_BOOST_TIME, requestedDuration),))
+
+    async def applySettings(
+        self,
+        mode: KWLState | None = None,
+        atHomeFanSpeed: int | None = None,
+        awayFanSpeed: int | None = None,
+        intensiveFanSpeed: int | None = None,
+        intensiveDuration: datetime.time | None = None,
+    ):
+        """Write a settings profile and check it with one read.
+
+        Values which are None are left as they are. Raises SettingsNotAppliedError
+        if the device did not take all values or a frame failed, the values it did
+        take are then written back to what they were before.
+        """
+        writes = {}
+        if intensiveDuration is not None:
+            writes[A_CYC_BOOST_TIME] = self.checkDurationLimit(intensiveDuration)
+        for address, fanSpeed in (
+            (A_CYC_HOME_SPEED_SETTING, atHomeFanSpeed),
+            (A_CYC_AWAY_SPEED_SETTING, awayFanSpeed),
+            (A_CYC_BOOST_SPEED_SETTING, intensiveFanSpeed),
+        ):
+            if fanSpeed is not None:
+                writes[address] = self.checkFanSpeedLimit(fanSpeed)
+        if mode is not None:
+            # a new duration is already used for the intensive mode started here
+            writes.update(self._modeWrites(mode, writes.get(A_CYC_BOOST_TIME)))
+        if not writes:
+            return
+        writes = tuple(writes.items())
+
+        async with self._settingsLock:
+            # queued writes go first, they must not overwrite the profile later
+            await self.flushWrites()
+            if self._values is None:
+                await self.readCurrentData(force=True)
+                if self._values is None:
+                    raise SettingsNotAppliedError("the device could not be read", ())
+            registers = [REGISTERS_BY_ADDRESS[address] for address, _ in writes]
+            previousValues = {
+                register.name: self._values[register.name] for register in registers
+            }
+
+            self._setOptimisticValues(writes)
+            self._inFlightWrites.append(writes)
+            written = []  # writes of the frames the device acknowledged
+            try:
+                try:
+                    await self._writeInFrames(writes, written)
+                finally:
+                    # the read below is sent after all frames, it confirms or overrules
+                    # them
+                    self._inFlightWrites.remove(writes)
+                response = await self._exchangeData(READ_STATUS_FRAME, _isStatusFrame)
+                self._parseData(response)
+            except Exception as exception:
+                # unknown which values the device took, the next read tells
+                self._dropOptimisticValues(writes, {})
+                self._sthModified = True
+                # the acknowledged frames are set back, the profile must not stay
+                # half applied
+                await self._rollBack(written, previousValues)
+                raise SettingsNotAppliedError(
+                    f"the settings could not be written and checked ({exception})",
+                    tuple(previousValues),
+                ) from exception
+            self._lastUpdate = datetime.datetime.now()
+            self._notifyStateListeners()
+
+            notApplied = [
+                register.name
+                for register, (_, value) in zip(registers, writes)
+                if not _isWritten(register, self._values[register.name], value)
+            ]
+            if notApplied:
+                taken = [
+                    write
+                    for register, write in zip(registers, writes)
+                    if register.name not in notApplied
+                ]
+                await self._rollBack(taken, previousValues)
+                raise SettingsNotAppliedError(
+                    f"the device did not take {', '.join(notApplied)}",
+                    tuple(notApplied),
+                )
+
+    async def _rollBack(self, writes, previousValues):
+        """Write the previous values of the registers the device did take."""
+        rollBack = tuple(
+            (address, previousValues[REGISTERS_BY_ADDRESS[address].name])
+            for address, value in writes
+            if previousValues[REGISTERS_BY_ADDRESS[address].name] != value
         )
-
-        request = bytes.fromhex(requestData)
-        response = await self._exchangeData(request)
-        if bytes.fromhex("0200f500f700") == response:
-            LOGGER.debug("expected response")
-        else:
-            LOGGER.debug("unexpected response")
-
+        if not rollBack:
+            return
+        LOGGER.warning(
+            f"rolling back {len(rollBack)} registers of an incomplete profile"
+        )
+        try:
+            await self._writeInFrames(rollBack)
+        except Exception as exception:
+            LOGGER.error(f"error in rolling back ({exception})")
+        # the rolled back values are shown after the next read
         self._sthModified = True
 
     async def test_connection(self) -> bool:
         # """Test connectivity by doing a read."""
-        request = bytes.fromhex("0300f6000000f900")
-        response = await self._exchangeData(request)
+        response = await self._exchangeData(READ_STATUS_FRAME, _isStatusFrame)
         self._parseData(response)
         return bool(response is not None)
 
     async def turnOffOn(self, requestTurnOff: bool):
-        if requestTurnOff is True:
-            requestData = "0400f900021205000413"
-        else:
-            requestData = "0400f90002120000ff12"
-
-        request = bytes.fromhex(requestData)
-        response = await self._exchangeData(request)
-        if bytes.fromhex("0200f500f700") == response:
-            LOGGER.debug("expected response")
-        else:
-            LOGGER.debug("unexpected response")
-
-        self._sthModified = True
+        await self.queueRegisterWrites(((A_CYC_MODE, 5 if requestTurnOff else 0),))
 
     @property
     def url(self):
         return self._url
 
+    @property
+    def state(self) -> DeviceState:
+        """All values of the last update, the generation changes with every update."""
+        return self._state
+
     @property
     def deviceModel(self):
-        return self._deviceModel
+        return self._state.deviceModel
 
     @property
     def deviceType(self):
-        return self._deviceType
+        return self._state.deviceType
 
     @property
     def serialNR(self):
-        return self._SerialNR
+        return self._state.serialNR
 
     @property
     def instanceState(self):
-        return self._instanceState
+        return self._state.instanceState
 
     @property
     def CurrentFanSpeed(self):
-        return self._CurrentFanSpeed
+        return self._state.currentFanSpeed
 
     @property
     def AtHomeFanSpeed(self):
-        return self._atHomeFanSpeed
+        return self._state.atHomeFanSpeed
 
     @property
     def AwayFanSpeed(self):
-        return self._awayFanSpeed
+        return self._state.awayFanSpeed
 
     @property
     def IntensivFanSpeed(self):
-        return self._intensivFanSpeed
+        return self._state.intensivFanSpeed
 
     @property
     def IntensivDuration(self):
-        return self._intensivDuration
+        return self._state.intensivDuration
 
     @property
     def OutsideTemperature(self):
-        return self._OutsideTemperature
+        return self._state.outsideTemperature
 
     @property
     def SupplyTemperature(self):
-        return self._SupplyTemperature
+        return self._state.supplyTemperature
 
     @property
     def IndoorTemperature(self):
-        return self._IndoorTemperature
+        return self._state.indoorTemperature
 
     @property
     def ExhaustTemperature(self):
-        return self._ExhaustTemperature
+        return self._state.exhaustTemperature
 
     @property
     def AirRH(self):
-        return self._AirRH
+        return self._state.airRH
 
     @property
     def filterInterval(self):
-        return self._filterInterval
+        return self._state.filterInterval
 
     @property
     def filterChanged(self):
-        return self._filterChanged
+        return self._state.filterChanged
 
     @property
     def filterDue(self):
-        return self._filterDue
+        return self._state.filterDue
+
+    @property
+    def lastFrame(self):
+        return self._lastFrame
+
+    @property
+    def changedRegisters(self):
+        """Names of the registers changed by the last update.
+
+        None if all of them may have changed.
+        """
+        return self._changedRegisters
+
+    @property
+    def retryIn(self):
+        """Seconds until the unreachable device is contacted again.
+
+        None if it is reachable.
+        """
+        return self._session.breaker.retryIn
+
+    @property
+    def lastUpdate(self):
+        """Time of the last successful read."""
+        return self._lastUpdate
+
+    @property
+    def lastWrite(self):
+        return self._lastWrite
 
     @property
     def sthModified(self):
@@ -387,8 +743,12 @@ class EasyControls3Instance:
 
     @property
     def IsOn(self):
-        return self._isOn
+        return self._state.isOn
 
     @property
     def CO2Value(self):
-        return self._CO2Value
+        return self._state.CO2Value
+
+    @property
+    def HasCO2Sensor(self):
+        return self._state.hasCO2Sensor
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .CircuitBreaker import CircuitBreaker, CircuitOpenError
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UnexpectedResponseError(ConnectionError):
+    """The device answered with a frame which is no answer to the request."""
+
+
+class EasyControls3Session:
+    """Long-lived websocket connection to one EasyControls 3 device.
+
+    The connection is opened on the first request and kept open (with keepalive
+    pings) for all following requests. If it drops it is re-established on the
+    next request, a request that failed on a stale connection is retried once.
+    Connecting and waiting for the response are bounded by timeouts, and a
+    device which keeps failing is not contacted until the breaker lets the next
+    request through.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pingInterval: float = 20,
+        pingTimeout: float = 20,
+        connectTimeout: float = 5,
+        responseTimeout: float = 5,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self._url = url
+        self._pingInterval = pingInterval
+        self._pingTimeout = pingTimeout
+        self._connectTimeout = connectTimeout
+        self._responseTimeout = responseTimeout
+        self._breaker = breaker if breaker is not None else CircuitBreaker()
+        self._lock = asyncio.Lock()
+        self._websocket = None
+        self._closed = False
+
+    async def _connect(self):
+        if self._websocket is None:
+            # imported on the first connect, it is not needed to load the integration
+            from websockets.asyncio.client import connect
+
+            self._websocket = await connect(
+                self._url,
+                ping_interval=self._pingInterval,
+                ping_timeout=self._pingTimeout,
+                open_timeout=self._connectTimeout,
+            )
+            LOGGER.debug(f"connected to {self._url}")
+        return self._websocket
+
+    async def _disconnect(self):
+        websocket = self._websocket
+        self._websocket = None
+        if websocket is not None:
+            try:
+                await websocket.close()
+            except Exception as exception:
+                LOGGER.debug(f"error while closing connection ({exception})")
+
+    async def _sendAndReceive(self, request):
+        websocket = await self._connect()
+        try:
+            async with asyncio.timeout(self._responseTimeout):
+                await websocket.send(request)
+                return await websocket.recv()
+        except BaseException:
+            # the connection state is unknown, e.g. a late answer could still arrive
+            # and would be taken as the answer to the next request
+            await self._disconnect()
+            raise
+
+    async def exchange(
+        self, request: bytes, isExpected=None, strict: bool = True
+    ) -> bytes:
+        """Send one request frame and return the response frame.
+
+        If isExpected(response) is false the connection is dropped: it may have
+        been a stray frame, and the real answer would then be taken for the answer
+        to the next request. If strict UnexpectedResponseError is raised and counts
+        as a failure of the device, otherwise the response is still returned.
+        """
+        async with self._lock:
+            if self._closed:
+                raise ConnectionError("session is closed")
+            if not self._breaker.allowRequest():
+                raise CircuitOpenError(
+                    f"{self._url} is unreachable, "
+                    f"next try in {self._breaker.retryIn:.0f}s"
+                )
+
+            try:
+                response = await self._exchangeWithRetry(request)
+                if isExpected is not None and not isExpected(response):
+                    await self._disconnect()
+                    if strict:
+                        raise UnexpectedResponseError(
+                            f"unexpected response from {self._url} "
+                            f"({len(response)} bytes)"
+                        )
+                    # the device did answer, the breaker takes it as a success
+                    LOGGER.debug(f"unexpected response from {self._url}, reconnecting")
+            except Exception:
+                self._breaker.recordFailure()
+                raise
+            except BaseException:
+                self._breaker.abortRequest()
+                raise
+            self._breaker.recordSuccess()
+            return response
+
+    async def _exchangeWithRetry(self, request):
+        from websockets.exceptions import ConnectionClosed
+
+        reusedConnection = self._websocket is not None
+        try:
+            return await self._sendAndReceive(request)
+        except ConnectionClosed:
+            if not reusedConnection or self._closed:
+                raise
+            LOGGER.debug("connection was closed by the device, reconnecting")
+
+        return await self._sendAndReceive(request)
+
+    async def close(self):
+        """Close the connection, no further requests are possible afterwards."""
+        # not waiting for the lock, closing the connection also ends a pending exchange
+        self._closed = True
+        await self._disconnect()
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def isConnected(self):
+        return self._websocket is not None
+
+    @property
+    def breaker(self):
+        return self._breaker
@@ -0,0 +1,44 @@
+import functools
+import struct
+
+# a frame is a list of little endian 16bit words:
+# length (number of following words), command, payload..., checksum
+# the checksum is the sum of all previous words (including the length)
+
+# commands
+ACKNOWLEDGE = 0x00F5
+READ_TABLE = 0x00F6
+WRITE_DATA = 0x00F9
+
+# writable registers
+A_CYC_STATE = 0x1201
+A_CYC_MODE = 0x1202
+A_CYC_BOOST_TIMER = 0x1204
+A_CYC_FIREPLACE_TIMER = 0x1205
+A_CYC_AWAY_SPEED_SETTING = 0x5015
+A_CYC_HOME_SPEED_SETTING = 0x501B
+A_CYC_BOOST_SPEED_SETTING = 0x5021
+A_CYC_BOOST_TIME = 0x5040
+
+
+def checksum(words) -> int:
+    return sum(words) & 0xFFFF
+
+
+def encodeFrame(command: int, *payload: int) -> bytes:
+    words = (len(payload) + 2, command, *payload)
+    return struct.pack(f"<{len(words) + 1}H", *words, checksum(words))
+
+
+@functools.lru_cache(maxsize=128)
+def encodeWriteFrame(writes: tuple) -> bytes:
+    """Encode a write of ((address, value), ...) into one frame.
+
+    The frames of recurring writes (mode switches, on/off) are cached.
+    """
+    payload = [word for address, value in writes for word in (address, value)]
+    return encodeFrame(WRITE_DATA, *payload)
+
+
+READ_STATUS_FRAME = encodeFrame(READ_TABLE, 0)
+ACKNOWLEDGE_FRAME = encodeFrame(ACKNOWLEDGE)
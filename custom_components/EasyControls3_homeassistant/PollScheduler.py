@@ -0,0 +1,118 @@
+"""Shared poll schedule for all devices of the integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+
+from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """Polls the coordinators of all devices, spread evenly over their interval.
+
+    Instead of one timer per device (which all fire in the same second) there
+    is one loop for all devices, and at most maxConcurrentPolls devices are read
+    at the same time.
+    """
+
+    def __init__(self, hass: HomeAssistant, maxConcurrentPolls: int = 4) -> None:
+        self._hass = hass
+        self._semaphore = asyncio.Semaphore(maxConcurrentPolls)
+        self._due = {}  # coordinator -> loop time of the next poll
+        self._polling = set()
+        self._wakeUp = asyncio.Event()
+        self._task = None
+
+    def register(self, coordinator):
+        coordinator.scheduler = self
+        self._due[coordinator] = None
+        self._spread()
+
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._run(), name="EasyControls3 poll scheduler"
+            )
+
+    def unregister(self, coordinator):
+        coordinator.scheduler = None
+        self._due.pop(coordinator, None)
+        if not self._due and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        else:
+            self._spread()
+
+    def reschedule(self, coordinator):
+        """Recalculate the next poll after the interval of a coordinator changed."""
+        if coordinator in self._due and coordinator not in self._polling:
+            self._due[coordinator] = (
+                asyncio.get_running_loop().time()
+                + coordinator.pollInterval.total_seconds()
+            )
+            self._wakeUp.set()
+
+    @property
+    def isEmpty(self):
+        return not self._due
+
+    def _spread(self):
+        # the first poll of every device is done by the setup, so the next one is
+        # due one interval later, shifted by its position in the list
+        now = asyncio.get_running_loop().time()
+        count = len(self._due)
+        for index, coordinator in enumerate(self._due):
+            if coordinator in self._polling:
+                # gets its next due time when the poll is done
+                continue
+            interval = coordinator.pollInterval.total_seconds()
+            self._due[coordinator] = now + interval * (index + 1) / count
+        self._wakeUp.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeUp.clear()
+            now = loop.time()
+            for coordinator, due in self._due.items():
+                if due > now:
+                    continue
+                # the next poll is scheduled when this one is done
+                self._due[coordinator] = math.inf
+                self._polling.add(coordinator)
+                self._hass.async_create_background_task(
+                    self._poll(coordinator, due), name=f"{coordinator.name} poll"
+                )
+
+            timeout = None
+            nextDue = min(self._due.values(), default=math.inf)
+            if nextDue != math.inf:
+                timeout = max(0.0, nextDue - loop.time())
+            try:
+                await asyncio.wait_for(self._wakeUp.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, coordinator, due):
+        try:
+            async with self._semaphore:
+                start = time.monotonic()
+                await coordinator.async_refresh()
+                coordinator.lastCycleTime = time.monotonic() - start
+            LOGGER.debug(
+                f"{coordinator.name} polled in {coordinator.lastCycleTime:.3f}s"
+            )
+        finally:
+            self._polling.discard(coordinator)
+            if coordinator in self._due:
+                # the interval may have changed with the poll, keep the phase
+                # unless the poll is late by more than an interval
+                self._due[coordinator] = max(
+                    due + coordinator.pollInterval.total_seconds(),
+                    asyncio.get_running_loop().time(),
+                )
+                self._wakeUp.set()
@@ -0,0 +1,208 @@
+import struct
+from typing import NamedTuple
+
+from .FrameEncoder import (
+    A_CYC_AWAY_SPEED_SETTING,
+    A_CYC_BOOST_SPEED_SETTING,
+    A_CYC_BOOST_TIME,
+    A_CYC_BOOST_TIMER,
+    A_CYC_FIREPLACE_TIMER,
+    A_CYC_HOME_SPEED_SETTING,
+    A_CYC_MODE,
+    A_CYC_STATE,
+)
+
+# struct format characters by (width in bytes, signed)
+_FORMATS = {
+    (1, False): "B",
+    (1, True): "b",
+    (2, False): "H",
+    (2, True): "h",
+    (4, False): "I",
+    (4, True): "i",
+}
+
+
+class Register(NamedTuple):
+    """A value in the status frame of the device.
+
+    offset is the byte position in the frame, values are stored big endian.
+    The device stores some values scaled (e.g. temperatures in 1/100 Kelvin),
+    those are decoded as round(raw / scale + bias, precision).
+    address is the register to write the value to, if it is writable.
+    Counters are timers the device counts down on its own.
+    refreshPeriod is the number of seconds a register is not checked for changes
+    after it was checked, 0 to check it in every frame.
+    """
+
+    name: str
+    offset: int
+    width: int = 1
+    signed: bool = False
+    scale: float = 1
+    bias: float = 0
+    precision: int | None = None
+    address: int | None = None
+    isCounter: bool = False
+    refreshPeriod: int = 0
+
+    @property
+    def isScaled(self):
+        return self.scale != 1 or self.bias != 0 or self.precision is not None
+
+
+class FrameDecoder:
+    """Decodes a list of registers from a frame with a single struct call.
+
+    The registers are compiled once into one struct format (with pad bytes for
+    the gaps), so decoding needs no per register indexing.
+    """
+
+    def __init__(self, registers) -> None:
+        registers = sorted(registers, key=lambda register: register.offset)
+
+        formatString = ">"
+        position = 0
+        for register in registers:
+            if register.offset < position:
+                raise ValueError(f"register {register.name} overlaps the previous one")
+            if register.offset > position:
+                formatString += f"{register.offset - position}x"
+            formatString += _FORMATS[(register.width, register.signed)]
+            position = register.offset + register.width
+
+        self._registers = tuple(registers)
+        self._struct = struct.Struct(formatString)
+        self._names = tuple(register.name for register in registers)
+        self._scaled = tuple(
+            (index, register.scale, register.bias, register.precision)
+            for index, register in enumerate(registers)
+            if register.isScaled
+        )
+        self._spans = tuple(
+            (register.name, register.offset, register.offset + register.width)
+            for register in registers
+        )
+        self._spansByPeriod = {}
+        for register, span in zip(registers, self._spans):
+            self._spansByPeriod.setdefault(register.refreshPeriod, []).append(span)
+        self._spansByPeriod = {
+            period: tuple(spans)
+            for period, spans in sorted(self._spansByPeriod.items())
+        }
+        # single registers are decoded with their own struct
+        self._single = {
+            register.name: (
+                struct.Struct(">" + _FORMATS[(register.width, register.signed)]),
+                register,
+            )
+            for register in registers
+        }
+
+    def decode(self, data) -> dict:
+        """Return a dict of register name to value.
+
+        data may be bytes or a memoryview.
+        """
+        values = list(self._struct.unpack_from(data))
+        for index, scale, bias, precision in self._scaled:
+            values[index] = round(values[index] / scale + bias, precision)
+        return dict(zip(self._names, values))
+
+    def changedRegisters(self, data, previous, refreshPeriod=None) -> frozenset:
+        """Return the names of the registers whose bytes differ between two frames.
+
+        With refreshPeriod only the registers with this refresh period are compared.
+        """
+        if data == previous:
+            return frozenset()
+        spans = (
+            self._spans if refreshPeriod is None else self._spansByPeriod[refreshPeriod]
+        )
+        data = memoryview(data)
+        previous = memoryview(previous)
+        return frozenset(
+            name for name, start, end in spans if data[start:end] != previous[start:end]
+        )
+
+    def decodeRegisters(self, data, names) -> dict:
+        """Return a dict of register name to value for the given registers only."""
+        values = {}
+        for name in names:
+            singleStruct, register = self._single[name]
+            (value,) = singleStruct.unpack_from(data, register.offset)
+            if register.isScaled:
+                value = round(
+                    value / register.scale + register.bias, register.precision
+                )
+            values[name] = value
+        return values
+
+    @property
+    def registers(self):
+        return self._registers
+
+    @property
+    def refreshPeriods(self):
+        """The distinct refresh periods of the registers, ascending."""
+        return tuple(self._spansByPeriod)
+
+    @property
+    def frameSize(self):
+        """Minimal length of a frame containing all registers."""
+        return self._struct.size
+
+
+def _temperature(name, register):
+    # temperatures are stored in 1/100 Kelvin
+    return Register(name, register * 2, 2, scale=100, bias=-273.15, precision=1)
+
+
+# values which (almost) never change are only checked once an hour
+COLD = 3600
+
+# most values are 16bit registers, offset = register number * 2, for the byte
+# sized values only the lower byte (offset + 1) is used
+STATUS_REGISTERS = (
+    # device info
+    Register("SerialNR", 14 * 2, 4, refreshPeriod=COLD),
+    Register("DeviceType", 16 * 2 + 1, refreshPeriod=COLD),
+    Register("DeviceModel", 17 * 2 + 1, refreshPeriod=COLD),
+    # fan
+    Register("CurrentFanSpeed", 64 * 2 + 1),
+    Register("AwayFanSpeed", 203 * 2 + 1, address=A_CYC_AWAY_SPEED_SETTING),
+    Register("AtHomeFanSpeed", 209 * 2 + 1, address=A_CYC_HOME_SPEED_SETTING),
+    Register("IntensivFanSpeed", 215 * 2 + 1, address=A_CYC_BOOST_SPEED_SETTING),
+    # temperatures
+    _temperature("IndoorTemperature", 65),
+    _temperature("ExhaustTemperature", 66),
+    _temperature("OutsideTemperature", 67),
+    # supply air right after the heat exchanger, before the post heater
+    _temperature("SupplyCellTemperature", 68),
+    _temperature("SupplyTemperature", 69),
+    # humidity and CO2
+    Register("AirRH", 74 * 2 + 1),
+    Register("CO2Value", 91 * 2, 2),
+    # state: A_CYC_STATE, A_CYC_MODE (on/off), A_CYC_BOOST_TIMER, A_CYC_FIREPLACE_TIMER
+    Register("CycleState", 107 * 2 + 1, address=A_CYC_STATE),
+    Register("CycleMode", 108 * 2 + 1, address=A_CYC_MODE),
+    Register("BoostTimer", 110 * 2, 2, address=A_CYC_BOOST_TIMER, isCounter=True),
+    Register(
+        "FireplaceTimer", 111 * 2, 2, address=A_CYC_FIREPLACE_TIMER, isCounter=True
+    ),
+    # filter, a month at helios has 30 days
+    Register("FilterInterval", 239 * 2 + 1, refreshPeriod=COLD),
+    Register("FilterChangedDay", 248 * 2 + 1, refreshPeriod=COLD),
+    Register("FilterChangedMonth", 249 * 2 + 1, refreshPeriod=COLD),
+    Register("FilterChangedYear", 250 * 2 + 1, refreshPeriod=COLD),
+    # duration of the intensive mode in minutes
+    Register("IntensivDuration", 246 * 2, 2, address=A_CYC_BOOST_TIME),
+)
+
+STATUS_DECODER = FrameDecoder(STATUS_REGISTERS)
+
+REGISTERS_BY_ADDRESS = {
+    register.address: register
+    for register in STATUS_REGISTERS
+    if register.address is not None
+}
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class PeriodStatistic(NamedTuple):
+    start: float  # timestamp the period starts at
+    mean: float
+    minimum: float
+    maximum: float
+    count: int
+
+
+class StatisticsBuffer:
+    """Mean, minimum and maximum of the readings per period (an hour by default).
+
+    The readings are summed up as they arrive, so only one running sum per
+    statistic and period is kept instead of the readings. A period is handed
+    out once a reading of a later time arrives, which makes it complete.
+    """
+
+    def __init__(self, period: int = 3600) -> None:
+        self._period = period
+        # statistic id -> period start -> [count, sum, minimum, maximum]
+        self._periods = {}
+
+    def add(self, statisticId: str, timestamp: float, value: float):
+        start = timestamp - timestamp % self._period
+        periods = self._periods.setdefault(statisticId, {})
+        current = periods.get(start)
+        if current is None:
+            periods[start] = [1, value, value, value]
+        else:
+            current[0] += 1
+            current[1] += value
+            current[2] = min(current[2], value)
+            current[3] = max(current[3], value)
+
+    def popCompleted(self, timestamp: float) -> dict[str, list[PeriodStatistic]]:
+        """Remove and return the periods over at timestamp, by statistic id."""
+        completed = {}
+        for statisticId, periods in self._periods.items():
+            for start in sorted(
+                start for start in periods if start + self._period <= timestamp
+            ):
+                count, total, minimum, maximum = periods.pop(start)
+                completed.setdefault(statisticId, []).append(
+                    PeriodStatistic(start, total / count, minimum, maximum, count)
+                )
+        return completed
+
+    def discard(self, statisticId: str):
+        """Drop the readings of a statistic which is not imported anymore."""
+        self._periods.pop(statisticId, None)
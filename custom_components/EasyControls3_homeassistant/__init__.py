@@ -2,29 +2,245 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
+import logging
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DEVICE_ID, Platform
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import (
+    ConfigEntryNotReady,
+    HomeAssistantError,
+    ServiceValidationError,
+)
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.storage import Store
 
 from . import EasyControls3Instance
-from .const import DOMAIN
+from .const import (
+    ATTR_AT_HOME_FAN_SPEED,
+    ATTR_AWAY_FAN_SPEED,
+    ATTR_INTENSIVE_DURATION,
+    ATTR_INTENSIVE_FAN_SPEED,
+    ATTR_MODE,
+    CONF_CO2_HIGH,
+    CONF_CO2_LOW,
+    CONF_DEMAND_CONTROL,
+    CONF_DEMAND_FAN_SPEED,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_RH_HIGH,
+    CONF_RH_LOW,
+    CONF_STATE_WRITE_INTERVAL,
+    DATA_CONNECTIONS,
+    DATA_SCHEDULER,
+    DEFAULT_CO2_HIGH,
+    DEFAULT_CO2_LOW,
+    DEFAULT_DEMAND_FAN_SPEED,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RH_HIGH,
+    DEFAULT_RH_LOW,
+    DEFAULT_STATE_WRITE_INTERVAL,
+    DOMAIN,
+    MAX_CONCURRENT_POLLS,
+    SERVICE_APPLY_SETTINGS,
+    STORAGE_VERSION,
+)
+from .ConnectionRegistry import ConnectionRegistry
+from .coordinator import EasyControls3Coordinator
+from .DemandControl import DemandControl
+from .EasyControls3Instance import SettingsNotAppliedError
+from .KWLStates import KWLState
+from .PollScheduler import PollScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+PLATFORMS = [
+    Platform.NUMBER,
+    Platform.SELECT,
+    Platform.SENSOR,
+    Platform.TIME,
+    Platform.SWITCH,
+]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+_FAN_SPEED = vol.All(vol.Coerce(int), vol.Range(min=1, max=100))
+APPLY_SETTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_MODE): vol.In([state.name for state in KWLState]),
+        vol.Optional(ATTR_AT_HOME_FAN_SPEED): _FAN_SPEED,
+        vol.Optional(ATTR_AWAY_FAN_SPEED): _FAN_SPEED,
+        vol.Optional(ATTR_INTENSIVE_FAN_SPEED): _FAN_SPEED,
+        vol.Optional(ATTR_INTENSIVE_DURATION): cv.time,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config) -> bool:
+    """Register the services, they are shared by all entries."""
+
+    async def applySettings(call: ServiceCall) -> None:
+        coordinator = _coordinatorOfDevice(hass, call.data[ATTR_DEVICE_ID])
+        mode = call.data.get(ATTR_MODE)
+        try:
+            await coordinator.easyConnector.applySettings(
+                mode=None if mode is None else KWLState[mode],
+                atHomeFanSpeed=call.data.get(ATTR_AT_HOME_FAN_SPEED),
+                awayFanSpeed=call.data.get(ATTR_AWAY_FAN_SPEED),
+                intensiveFanSpeed=call.data.get(ATTR_INTENSIVE_FAN_SPEED),
+                intensiveDuration=call.data.get(ATTR_INTENSIVE_DURATION),
+            )
+        except SettingsNotAppliedError as exception:
+            raise HomeAssistantError(str(exception)) from exception
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_SETTINGS, applySettings, schema=APPLY_SETTINGS_SCHEMA
+    )
+    return True
+
+
+def _coordinatorOfDevice(hass: HomeAssistant, deviceId: str):
+    device = dr.async_get(hass).async_get(deviceId)
+    if device is not None:
+        for entryId in device.config_entries:
+            coordinator = hass.data.get(DOMAIN, {}).get(entryId)
+            if coordinator is not None:
+                return coordinator
+    raise ServiceValidationError(f"{deviceId} is no loaded {DOMAIN} device")
+
 
-PLATFORMS = [Platform.NUMBER, Platform.SELECT, Platform.SENSOR, Platform.TIME, Platform.SWITCH]
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Remove entries of a host which has an entry already."""
+    if entry.version == 1 and entry.minor_version < 2:
+        # the entities of both entries would have the same ids, only the
+        # entities of the first one could be added anyway
+        first = next(
+            other
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.data["host"] == entry.data["host"]
+        )
+        if first is not entry:
+            LOGGER.warning(
+                f"removing the entry {entry.title}, the entry {first.title} is for "
+                f"{entry.data['host']} already"
+            )
+            hass.async_create_task(hass.config_entries.async_remove(entry.entry_id))
+            return False
+        hass.config_entries.async_update_entry(entry, minor_version=2)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = (
-        EasyControls3Instance.EasyControls3Instance(entry.data["host"])
+    if DATA_CONNECTIONS not in hass.data:
+        hass.data[DATA_CONNECTIONS] = ConnectionRegistry()
+    # one connection and one poll schedule per host, a reloaded entry waits until
+    # its old connection is closed (there is one entry per host, see
+    # async_migrate_entry)
+    coordinator = await hass.data[DATA_CONNECTIONS].acquire(
+        entry.data["host"], lambda: _createCoordinator(hass, entry)
     )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def _createCoordinator(hass: HomeAssistant, entry: ConfigEntry):
+    easyConnector = EasyControls3Instance.EasyControls3Instance(entry.data["host"])
+    if entry.options.get(CONF_DEMAND_CONTROL, False):
+        easyConnector.setDemandControl(
+            DemandControl(
+                co2High=entry.options.get(CONF_CO2_HIGH, DEFAULT_CO2_HIGH),
+                co2Low=entry.options.get(CONF_CO2_LOW, DEFAULT_CO2_LOW),
+                rhHigh=entry.options.get(CONF_RH_HIGH, DEFAULT_RH_HIGH),
+                rhLow=entry.options.get(CONF_RH_LOW, DEFAULT_RH_LOW),
+                demandFanSpeed=entry.options.get(
+                    CONF_DEMAND_FAN_SPEED, DEFAULT_DEMAND_FAN_SPEED
+                ),
+            )
+        )
+    coordinator = EasyControls3Coordinator(
+        hass,
+        easyConnector,
+        minInterval=timedelta(
+            seconds=entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        ),
+        maxInterval=timedelta(
+            seconds=entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+        ),
+        snapshotStore=_snapshotStore(hass, entry),
+        importStatistics=entry.options.get(CONF_IMPORT_STATISTICS, False),
+        stateWriteInterval=entry.options.get(
+            CONF_STATE_WRITE_INTERVAL, DEFAULT_STATE_WRITE_INTERVAL
+        ),
+    )
+
+    # the entities need the serial number for their ids, after a restart it is
+    # taken from the snapshot and the device is read in the background
+    if await coordinator.restoreSnapshot():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{coordinator.name} first refresh"
+        )
+    else:
+        # one read for all platforms
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except BaseException:
+            await easyConnector.close()
+            raise
+        if easyConnector.serialNR is None:
+            await easyConnector.close()
+            raise ConfigEntryNotReady(f"unable to read from {entry.data['host']}")
+
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = PollScheduler(hass, MAX_CONCURRENT_POLLS)
+    hass.data[DATA_SCHEDULER].register(coordinator)
+    return coordinator
+
+
+async def _closeCoordinator(hass: HomeAssistant, coordinator):
+    scheduler = hass.data[DATA_SCHEDULER]
+    scheduler.unregister(coordinator)
+    if scheduler.isEmpty:
+        hass.data.pop(DATA_SCHEDULER)
+    await coordinator.easyConnector.close()
+    # written now, a delayed save would outlive a removed entry
+    await coordinator.saveSnapshot()
+
+
+def _snapshotStore(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry after the options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # the connection is closed with the last entry of the host
+        connections = hass.data[DATA_CONNECTIONS]
+        await connections.release(
+            entry.data["host"], lambda coordinator: _closeCoordinator(hass, coordinator)
+        )
+        if connections.isEmpty:
+            hass.data.pop(DATA_CONNECTIONS)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the snapshot of a deleted config entry."""
+    await _snapshotStore(hass, entry).async_remove()
@@ -9,15 +9,37 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN  # pylint:disable=unused-import
+from .const import (  # pylint:disable=unused-import
+    CONF_CO2_HIGH,
+    CONF_CO2_LOW,
+    CONF_DEMAND_CONTROL,
+    CONF_DEMAND_FAN_SPEED,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_RH_HIGH,
+    CONF_RH_LOW,
+    CONF_STATE_WRITE_INTERVAL,
+    DEFAULT_CO2_HIGH,
+    DEFAULT_CO2_LOW,
+    DEFAULT_DEMAND_FAN_SPEED,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RH_HIGH,
+    DEFAULT_RH_LOW,
+    DEFAULT_STATE_WRITE_INTERVAL,
+    DOMAIN,
+)
+from .Discovery import discoverDevices
 from .EasyControls3Instance import EasyControls3Instance
 
 _LOGGER = logging.getLogger(__name__)
 
 
 DATA_SCHEMA = vol.Schema({("host"): str})
+DISCOVERY_SCHEMA = vol.Schema({vol.Required("network", default="192.168.1.0/24"): str})
 
 
 async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
@@ -32,7 +54,10 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
         raise InvalidHost
 
     easyControlsInstance = EasyControls3Instance(data["host"])
-    result = await easyControlsInstance.test_connection()
+    try:
+        result = await easyControlsInstance.test_connection()
+    finally:
+        await easyControlsInstance.close()
     if not result:
         raise CannotConnect
 
@@ -41,12 +66,31 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
+    # 2: only one entry per host (see async_migrate_entry)
+    MINOR_VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return OptionsFlowHandler(config_entry)
+
+    def __init__(self):
+        self._discoveredDevices = {}
+        self._discoveredDevice = None
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Let the user type the host or search the network."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["manual", "discovery"]
+        )
+
+    async def async_step_manual(self, user_input=None):
+        """Handle a typed host."""
         errors = {}
         if user_input is not None:
+            # a second entry of the same device would only duplicate its entities
+            self._async_abort_entries_match({"host": user_input["host"]})
             try:
                 info = await validate_input(self.hass, user_input)
 
@@ -61,8 +105,150 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         # If there is no user input or there were errors, show the form again, including any errors that were found with the input.
         return self.async_show_form(
-            step_id="user", data_schema=DATA_SCHEMA, errors=errors
+            step_id="manual", data_schema=DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_discovery(self, user_input=None):
+        """Search a network for devices."""
+        errors = {}
+        if user_input is not None:
+            try:
+                devices = await discoverDevices(user_input["network"])
+            except ValueError:
+                errors["network"] = "invalid_network"
+            else:
+                configured = {
+                    entry.data["host"] for entry in self._async_current_entries()
+                }
+                self._discoveredDevices = {
+                    device.host: device
+                    for device in devices
+                    if device.host not in configured
+                }
+                if self._discoveredDevices:
+                    return await self.async_step_pick()
+                errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="discovery", data_schema=DISCOVERY_SCHEMA, errors=errors
+        )
+
+    async def async_step_pick(self, user_input=None):
+        """Add one of the devices found, the others are offered as discovered."""
+        if user_input is not None:
+            device = self._discoveredDevices.pop(user_input["host"])
+            for other in self._discoveredDevices.values():
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                        data=other._asdict(),
+                    )
+                )
+            await self.async_set_unique_id(str(device.serialNR))
+            self._abort_if_unique_id_configured()
+            return self.async_create_entry(
+                title=device.host, data={"host": device.host}
+            )
+
+        devices = {
+            device.host: f"{device.deviceModel} ({device.serialNR}) at {device.host}"
+            for device in self._discoveredDevices.values()
+        }
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required("host"): vol.In(devices)}),
+        )
+
+    async def async_step_integration_discovery(self, discovery_info):
+        """Handle a device found by the network search of another flow."""
+        self._async_abort_entries_match({"host": discovery_info["host"]})
+        await self.async_set_unique_id(str(discovery_info["serialNR"]))
+        self._abort_if_unique_id_configured()
+        self._discoveredDevice = discovery_info
+        self.context["title_placeholders"] = {
+            "name": f"{discovery_info['deviceModel']} ({discovery_info['host']})"
+        }
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(self, user_input=None):
+        host = self._discoveredDevice["host"]
+        if user_input is not None:
+            return self.async_create_entry(title=host, data={"host": host})
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            description_placeholders={
+                "model": self._discoveredDevice["deviceModel"],
+                "serial": str(self._discoveredDevice["serialNR"]),
+                "host": host,
+            },
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Poll interval bounds, demand control and recorder load."""
+
+    def __init__(self, config_entry):
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            elif (
+                user_input[CONF_CO2_LOW] >= user_input[CONF_CO2_HIGH]
+                or user_input[CONF_RH_LOW] >= user_input[CONF_RH_HIGH]
+            ):
+                errors["base"] = "invalid_threshold"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_INTERVAL,
+                    default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=2, max=3600)),
+                vol.Required(
+                    CONF_MAX_INTERVAL,
+                    default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=2, max=3600)),
+                vol.Required(
+                    CONF_DEMAND_CONTROL, default=options.get(CONF_DEMAND_CONTROL, False)
+                ): bool,
+                vol.Required(
+                    CONF_CO2_HIGH, default=options.get(CONF_CO2_HIGH, DEFAULT_CO2_HIGH)
+                ): vol.All(vol.Coerce(int), vol.Range(min=400, max=5000)),
+                vol.Required(
+                    CONF_CO2_LOW, default=options.get(CONF_CO2_LOW, DEFAULT_CO2_LOW)
+                ): vol.All(vol.Coerce(int), vol.Range(min=400, max=5000)),
+                vol.Required(
+                    CONF_RH_HIGH, default=options.get(CONF_RH_HIGH, DEFAULT_RH_HIGH)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Required(
+                    CONF_RH_LOW, default=options.get(CONF_RH_LOW, DEFAULT_RH_LOW)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Required(
+                    CONF_DEMAND_FAN_SPEED,
+                    default=options.get(
+                        CONF_DEMAND_FAN_SPEED, DEFAULT_DEMAND_FAN_SPEED
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Required(
+                    CONF_IMPORT_STATISTICS,
+                    default=options.get(CONF_IMPORT_STATISTICS, False),
+                ): bool,
+                vol.Required(
+                    CONF_STATE_WRITE_INTERVAL,
+                    default=options.get(
+                        CONF_STATE_WRITE_INTERVAL, DEFAULT_STATE_WRITE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            }
         )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
 
 
 class CannotConnect(exceptions.HomeAssistantError):
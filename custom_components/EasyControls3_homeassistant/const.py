@@ -1 +1,36 @@
 DOMAIN = "EasyControls3_homeassistant"
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
+MAX_CONCURRENT_POLLS = 4
+
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+DEFAULT_MIN_INTERVAL = 10  # seconds
+DEFAULT_MAX_INTERVAL = 300  # seconds
+
+# version of the stored device snapshots
+STORAGE_VERSION = 1
+
+CONF_DEMAND_CONTROL = "demand_control"
+CONF_CO2_HIGH = "co2_high"
+CONF_CO2_LOW = "co2_low"
+CONF_RH_HIGH = "rh_high"
+CONF_RH_LOW = "rh_low"
+CONF_DEMAND_FAN_SPEED = "demand_fan_speed"
+DEFAULT_CO2_HIGH = 1000  # ppm
+DEFAULT_CO2_LOW = 800  # ppm
+DEFAULT_RH_HIGH = 70  # %
+DEFAULT_RH_LOW = 60  # %
+DEFAULT_DEMAND_FAN_SPEED = 80  # %
+
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_STATE_WRITE_INTERVAL = "state_write_interval"
+DEFAULT_STATE_WRITE_INTERVAL = 0  # seconds, 0 writes every change
+
+SERVICE_APPLY_SETTINGS = "apply_settings"
+ATTR_MODE = "mode"
+ATTR_AT_HOME_FAN_SPEED = "at_home_fan_speed"
+ATTR_AWAY_FAN_SPEED = "away_fan_speed"
+ATTR_INTENSIVE_FAN_SPEED = "intensive_fan_speed"
+ATTR_INTENSIVE_DURATION = "intensive_duration"
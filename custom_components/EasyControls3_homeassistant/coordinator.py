@@ -0,0 +1,216 @@
+"""Coordinator reading the device once per interval for all entities."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import struct
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .AdaptivePolling import AdaptivePollInterval
+from .const import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, DOMAIN
+from .DerivedMetrics import DerivedMetrics
+from .EasyControls3Instance import EasyControls3Instance
+from .StatisticsBuffer import StatisticsBuffer
+
+LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=60)
+# the snapshot is only for the start, saving it once in a while is enough
+SNAPSHOT_SAVE_DELAY = 300
+
+
+class EasyControls3Coordinator(DataUpdateCoordinator):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        easyConnector: EasyControls3Instance,
+        minInterval: timedelta = timedelta(seconds=DEFAULT_MIN_INTERVAL),
+        maxInterval: timedelta = timedelta(seconds=DEFAULT_MAX_INTERVAL),
+        snapshotStore: Store | None = None,
+        importStatistics: bool = False,
+        stateWriteInterval: float = 0,
+    ) -> None:
+        # no own timer, the polls of all devices are scheduled by the PollScheduler
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN} {easyConnector.url}",
+            update_interval=None,
+        )
+        self.easyConnector = easyConnector
+        self._adaptiveInterval = AdaptivePollInterval(
+            minInterval, maxInterval, baseInterval=SCAN_INTERVAL
+        )
+        self.pollInterval = self._adaptiveInterval.interval
+        self.lastCycleTime = None
+        self.scheduler = None
+        self.metrics = DerivedMetrics()
+        self._snapshotStore = snapshotStore
+        # measurement entities write their state at most this often (seconds)
+        self.stateWriteInterval = stateWriteInterval
+        # with the import the hourly statistics are made from every read, not
+        # from the written states
+        self.importStatistics = importStatistics
+        self._statisticsBuffer = StatisticsBuffer()
+        self._trackedStatistics = {}  # entity id -> (unit, value getter)
+        self._isRecorderMissingLogged = False
+        self._snapshotSerialNR = (
+            None  # serial of a restored snapshot, until a read confirms it
+        )
+        easyConnector.addStateListener(self._handleStateChange)
+
+    @callback
+    def _handleStateChange(self):
+        # written values are shown right away, without waiting for the next read
+        self.async_update_listeners()
+        self._updatePollInterval(isPoll=False)
+        # e.g. the fan speed set by the demand control, it is not read again by a poll
+        self._saveSnapshotLater()
+
+    @callback
+    def _saveSnapshotLater(self):
+        if self._snapshotStore is not None and self.easyConnector.lastFrame is not None:
+            self._snapshotStore.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+    def _updatePollInterval(self, isPoll: bool = True):
+        interval = self._adaptiveInterval.next(self.easyConnector, isPoll)
+        if interval != self.pollInterval:
+            LOGGER.debug(f"{self.name} is polled every {interval} now")
+            self.pollInterval = interval
+            if self.scheduler is not None:
+                self.scheduler.reschedule(self)
+
+    async def restoreSnapshot(self) -> bool:
+        """Show the values saved before the restart, False if there are none."""
+        if self._snapshotStore is None:
+            return False
+        snapshot = await self._snapshotStore.async_load()
+        if not snapshot:
+            return False
+        try:
+            serialNR = snapshot["serialNR"]
+            self.easyConnector.restoreFrame(bytes.fromhex(snapshot["frame"]))
+        except (KeyError, TypeError, ValueError, struct.error) as exception:
+            LOGGER.warning(f"ignoring invalid snapshot of {self.name} ({exception})")
+            return False
+
+        # whether the device at the host is still the same is known after the first read
+        self._snapshotSerialNR = serialNR
+        demand = snapshot.get("demand")
+        if demand:
+            self.easyConnector.resumeDemandControl(*demand)
+        self.async_set_updated_data(self.easyConnector)
+        return True
+
+    def _checkSnapshotDevice(self):
+        serialNR = self.easyConnector.serialNR
+        if serialNR != self._snapshotSerialNR:
+            # the snapshot is replaced with the one of the device answering now
+            LOGGER.warning(
+                f"{self.name} is the device {serialNR} now, the values shown after "
+                f"the restart were of the device {self._snapshotSerialNR}, reload the "
+                "entry to show the entities of the new device"
+            )
+        self._snapshotSerialNR = None
+
+    def _snapshot(self):
+        return {
+            "serialNR": self.easyConnector.serialNR,
+            "frame": self.easyConnector.lastFrame.hex(),
+            # the AtHome fan speed to set back once a demand ends
+            "demand": self.easyConnector.demandRaisedFanSpeeds,
+        }
+
+    async def saveSnapshot(self):
+        """Save the snapshot now instead of after the delay."""
+        if self._snapshotStore is not None and self.easyConnector.lastFrame is not None:
+            await self._snapshotStore.async_save(self._snapshot())
+
+    async def _async_update_data(self):
+        # the instance keeps the last values and decides about the availability itself
+        await self.easyConnector.readCurrentData(force=True)
+        if (
+            self._snapshotSerialNR is not None
+            and self.easyConnector.lastUpdate is not None
+        ):
+            self._checkSnapshotDevice()
+        if self.easyConnector.serialNR is not None:
+            self._updatePollInterval()
+            if self.easyConnector.lastUpdate is not None:
+                timestamp = self.easyConnector.lastUpdate.timestamp()
+                self.metrics.update(self.easyConnector.state, timestamp)
+                if self.importStatistics:
+                    self._bufferStatistics(timestamp)
+            if self.easyConnector.changedRegisters != frozenset():
+                self._saveSnapshotLater()
+        return self.easyConnector
+
+    @callback
+    def trackStatistic(self, entityId: str, unit: str | None, getValue):
+        """Import hourly statistics of getValue() for entityId.
+
+        Returns a callback to stop.
+        """
+        self._trackedStatistics[entityId] = (unit, getValue)
+
+        @callback
+        def untrack():
+            self._trackedStatistics.pop(entityId, None)
+            self._statisticsBuffer.discard(entityId)
+
+        return untrack
+
+    def _bufferStatistics(self, timestamp: float):
+        for entityId, (_, getValue) in self._trackedStatistics.items():
+            value = getValue()
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._statisticsBuffer.add(entityId, timestamp, value)
+        completed = self._statisticsBuffer.popCompleted(timestamp)
+        if completed:
+            self._importStatistics(completed)
+
+    def _importStatistics(self, completed):
+        if "recorder" not in self.hass.config.components:
+            if not self._isRecorderMissingLogged:
+                LOGGER.warning(
+                    f"{self.name} can not import statistics without the recorder"
+                )
+                self._isRecorderMissingLogged = True
+            return
+        # the recorder is only loaded with the import enabled
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import async_import_statistics
+
+        for entityId, periods in completed.items():
+            unit, _ = self._trackedStatistics[entityId]
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=None,
+                source="recorder",
+                statistic_id=entityId,
+                unit_of_measurement=unit,
+            )
+            # one recorder job per entity, however many hours are complete
+            async_import_statistics(
+                self.hass,
+                metadata,
+                [
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(period.start),
+                        mean=period.mean,
+                        min=period.minimum,
+                        max=period.maximum,
+                    )
+                    for period in periods
+                ],
+            )
+        LOGGER.debug(f"{self.name} imported statistics of {len(completed)} entities")
@@ -0,0 +1,66 @@
+"""Base class for the entities of all platforms."""
+
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class EasyControls3Entity(CoordinatorEntity):
+    """Entity which is only written if one of its registers changed."""
+
+    # names of the registers (see RegisterMap) the entity shows, None for all
+    _registers = None
+    # measurements are written at most every stateWriteInterval of the coordinator
+    _isThrottled = False
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._easyConnector = coordinator.easyConnector
+        self._lastWrite = None
+        self._lastAvailable = None
+        self._delayedWrite = None  # cancels the timer of a throttled write
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancelDelayedWrite)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self._easyConnector.changedRegisters
+        if (
+            changed is not None
+            and self._registers is not None
+            and changed.isdisjoint(self._registers)
+        ):
+            return
+        if self._isThrottled and self.coordinator.stateWriteInterval:
+            delay = (
+                self._lastWrite + self.coordinator.stateWriteInterval - time.monotonic()
+                if self._lastWrite is not None
+                else 0
+            )
+            if delay > 0 and self.available == self._lastAvailable:
+                # the latest values are written once the interval is over
+                if self._delayedWrite is None:
+                    self._delayedWrite = async_call_later(
+                        self.hass, delay, self._writeThrottledState
+                    )
+                return
+            self._writeThrottledState()
+            return
+        super()._handle_coordinator_update()
+
+    @callback
+    def _cancelDelayedWrite(self) -> None:
+        if self._delayedWrite is not None:
+            self._delayedWrite()
+            self._delayedWrite = None
+
+    @callback
+    def _writeThrottledState(self, _now=None) -> None:
+        self._cancelDelayedWrite()
+        self._lastWrite = time.monotonic()
+        self._lastAvailable = self.available
+        self.async_write_ha_state()
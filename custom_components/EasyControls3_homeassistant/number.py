@@ -1,35 +1,26 @@
-from datetime import timedelta
-
 from homeassistant.components.number import NumberDeviceClass, NumberEntity
+from homeassistant.core import callback
 
 from .const import DOMAIN
-
-SCAN_INTERVAL = timedelta(seconds=60)
-MIN_TIME_BETWEEN_SCANS = timedelta(seconds=30)
+from .entity import EasyControls3Entity
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
-    easyConnector = hass.data[DOMAIN][config_entry.entry_id]
-
-    if easyConnector.serialNR is None:
-        await easyConnector.readCurrentData()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
     async_add_entities(
         [
-            FanSpeedNumberAtHome(easyConnector),
-            FanSpeedNumberAway(easyConnector),
-            FanSpeedNumberIntensive(easyConnector),
+            FanSpeedNumberAtHome(coordinator),
+            FanSpeedNumberAway(coordinator),
+            FanSpeedNumberIntensive(coordinator),
         ]
     )
 
 
-class FanSpeedNumber(NumberEntity):
+class FanSpeedNumber(EasyControls3Entity, NumberEntity):
     device_class = NumberDeviceClass.POWER_FACTOR
     native_step = 1.0
 
-    def __init__(self, easyConnector):
-        self._easyConnector = easyConnector
-
     @property
     def device_info(self):
         """Return information to link this entity with the correct device."""
@@ -45,8 +36,10 @@ class FanSpeedNumber(NumberEntity):
 
 
 class FanSpeedNumberAtHome(FanSpeedNumber):
-    def __init__(self, easyConnector):
-        super().__init__(easyConnector)
+    _registers = {"AtHomeFanSpeed"}
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
         self._attr_unique_id = f"{self._easyConnector.serialNR}_atHomeFanSpeed"
 
         # The name of the entity
@@ -65,14 +58,17 @@ class FanSpeedNumberAtHome(FanSpeedNumber):
         self.native_value = value
         await self._easyConnector.setAtHomeFanSpeed(value)
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
+    @callback
+    def _handle_coordinator_update(self) -> None:
         self.native_value = self._easyConnector.AtHomeFanSpeed
+        super()._handle_coordinator_update()
 
 
 class FanSpeedNumberAway(FanSpeedNumber):
-    def __init__(self, easyConnector):
-        super().__init__(easyConnector)
+    _registers = {"AwayFanSpeed"}
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
         self._attr_unique_id = f"{self._easyConnector.serialNR}_awayFanSpeed"
 
         # The name of the entity
@@ -89,14 +85,17 @@ class FanSpeedNumberAway(FanSpeedNumber):
         self.native_value = value
         await self._easyConnector.setAwayFanSpeed(value)
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
+    @callback
+    def _handle_coordinator_update(self) -> None:
         self.native_value = self._easyConnector.AwayFanSpeed
+        super()._handle_coordinator_update()
 
 
 class FanSpeedNumberIntensive(FanSpeedNumber):
-    def __init__(self, easyConnector):
-        super().__init__(easyConnector)
+    _registers = {"IntensivFanSpeed"}
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
         self._attr_unique_id = f"{self._easyConnector.serialNR}_intensivFanSpeed"
 
         # The name of the entity
@@ -113,6 +112,7 @@ class FanSpeedNumberIntensive(FanSpeedNumber):
         self.native_value = value
         await self._easyConnector.setIntensiveFanSpeed(value)
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
+    @callback
+    def _handle_coordinator_update(self) -> None:
         self.native_value = self._easyConnector.IntensivFanSpeed
+        super()._handle_coordinator_update()
@@ -1,26 +1,22 @@
-from datetime import timedelta
-
 from homeassistant.components.select import SelectEntity
+from homeassistant.core import callback
 
 from .const import DOMAIN
+from .entity import EasyControls3Entity
 from .KWLStates import KWLState
 
-SCAN_INTERVAL = timedelta(seconds=60)
-MIN_TIME_BETWEEN_SCANS = timedelta(seconds=30)
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
-    easyConnector = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    if easyConnector.serialNR is None:
-        await easyConnector.readCurrentData()
+    async_add_entities([StateSelect(coordinator)])
 
-    async_add_entities([StateSelect(easyConnector)])
 
+class StateSelect(EasyControls3Entity, SelectEntity):
+    _registers = {"CycleState", "BoostTimer", "FireplaceTimer"}
 
-class StateSelect(SelectEntity):
-    def __init__(self, easyConnector):
-        self._easyConnector = easyConnector
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_State"
 
@@ -41,9 +37,10 @@ class StateSelect(SelectEntity):
     def available(self) -> bool:
         return self._easyConnector.IsAvailable
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
+    @callback
+    def _handle_coordinator_update(self) -> None:
         self._attr_current_option = str(self._easyConnector.instanceState.name)
+        super()._handle_coordinator_update()
 
     @property
     def name(self):
@@ -1,53 +1,110 @@
-from datetime import timedelta
-
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.const import (
     PERCENTAGE,
     UnitOfTemperature,
+    UnitOfTime,
     CONCENTRATION_PARTS_PER_MILLION,
+    EntityCategory,
 )
 
 from .const import DOMAIN
-
-SCAN_INTERVAL = timedelta(seconds=60)
-MIN_TIME_BETWEEN_SCANS = timedelta(seconds=30)
+from .entity import EasyControls3Entity
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add sensors for passed config_entry in HA."""
-    easyConnector = hass.data[DOMAIN][config_entry.entry_id]
-
-    if easyConnector.serialNR is None:
-        await easyConnector.readCurrentData()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    easyConnector = coordinator.easyConnector
 
     new_devices = []
 
-    new_devices.append(HumiditySensor(easyConnector))
-    new_devices.append(OutsideTemperatureSensor(easyConnector))
-    new_devices.append(SupplyTemperatureSensor(easyConnector))
-    new_devices.append(IndoorTemperatureSensor(easyConnector))
-    new_devices.append(ExhaustTemperatureSensor(easyConnector))
-    new_devices.append(CurrentFanSpeed(easyConnector))
-    new_devices.append(FilterChanged(easyConnector))
-    new_devices.append(FilterDue(easyConnector))
+    new_devices.append(HumiditySensor(coordinator))
+    new_devices.append(OutsideTemperatureSensor(coordinator))
+    new_devices.append(SupplyTemperatureSensor(coordinator))
+    new_devices.append(IndoorTemperatureSensor(coordinator))
+    new_devices.append(ExhaustTemperatureSensor(coordinator))
+    new_devices.append(CurrentFanSpeed(coordinator))
+    new_devices.append(FilterChanged(coordinator))
+    new_devices.append(FilterDue(coordinator))
+    new_devices.append(PollCycleTime(coordinator))
+    new_devices.append(HeatRecoveryEfficiency(coordinator))
+    new_devices.append(
+        DerivedMetricSensor(
+            coordinator,
+            "heatRecoveryEfficiency",
+            "mean",
+            "heat recovery efficiency 1h average",
+        )
+    )
+    new_devices.append(
+        DerivedMetricSensor(
+            coordinator, "indoorTemperature", "mean", "Indoor Temperature 1h average"
+        )
+    )
+    new_devices.append(
+        DerivedMetricSensor(
+            coordinator, "airRH", "mean", "Air Relativ Humidity 1h average"
+        )
+    )
 
-    if easyConnector.CO2Value != 0xFFFF:  # only add CO2 sensor if it is available
-        new_devices.append(CO2Sensor(easyConnector))
+    if easyConnector.HasCO2Sensor:  # only add CO2 sensor if it is available
+        new_devices.append(CO2Sensor(coordinator))
+        new_devices.append(
+            DerivedMetricSensor(coordinator, "CO2Value", "mean", "CO2 Value 1h average")
+        )
+        new_devices.append(
+            DerivedMetricSensor(
+                coordinator, "CO2Value", "minimum", "CO2 Value 1h minimum"
+            )
+        )
+        new_devices.append(
+            DerivedMetricSensor(
+                coordinator, "CO2Value", "maximum", "CO2 Value 1h maximum"
+            )
+        )
+        new_devices.append(
+            DerivedMetricSensor(
+                coordinator, "CO2Value", "rate", "CO2 Value change rate"
+            )
+        )
+
+    new_devices.extend(
+        RegisterSensor(coordinator, description) for description in REGISTER_SENSORS
+    )
 
     if new_devices:
         async_add_entities(new_devices)
 
 
-class SensorBase(SensorEntity):
+class SensorBase(EasyControls3Entity, SensorEntity):
     """Base representation of a Sensor."""
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        self._easyConnector = easyConnector
+        super().__init__(coordinator)
+        self._isMeasurement = self.state_class == SensorStateClass.MEASUREMENT
+        self._isThrottled = self._isMeasurement
+        if self._isMeasurement and coordinator.importStatistics:
+            # the hourly statistics are imported, so the recorder must not
+            # compile its own from the states
+            self.state_class = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._isMeasurement and self.coordinator.importStatistics:
+            self.async_on_remove(
+                self.coordinator.trackStatistic(
+                    self.entity_id, self.unit_of_measurement, self._measuredValue
+                )
+            )
+
+    def _measuredValue(self):
+        return self.state if self.available else None
 
     @property
     def device_info(self):
@@ -69,10 +126,11 @@ class HumiditySensor(SensorBase):
     native_value = int
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"AirRH"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_AirRH"
         self._attr_name = f"{self._easyConnector.deviceModel} Air Relativ Humidity"
@@ -82,10 +140,6 @@ class HumiditySensor(SensorBase):
         """Return the state of the sensor."""
         return self._easyConnector.AirRH
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.AirRH
-
 
 class OutsideTemperatureSensor(SensorBase):
     device_class = SensorDeviceClass.TEMPERATURE
@@ -94,10 +148,11 @@ class OutsideTemperatureSensor(SensorBase):
     native_value = float
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"OutsideTemperature"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_OutsideTemperature"
         self._attr_name = f"{self._easyConnector.deviceModel} Outside Temperature"
@@ -107,10 +162,6 @@ class OutsideTemperatureSensor(SensorBase):
         """Return the state of the sensor."""
         return self._easyConnector.OutsideTemperature
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.OutsideTemperature
-
 
 class SupplyTemperatureSensor(SensorBase):
     device_class = SensorDeviceClass.TEMPERATURE
@@ -119,10 +170,11 @@ class SupplyTemperatureSensor(SensorBase):
     native_value = float
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"SupplyTemperature"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_SupplyTemperature"
         self._attr_name = f"{self._easyConnector.deviceModel} Supply Temperature"
@@ -132,10 +184,6 @@ class SupplyTemperatureSensor(SensorBase):
         """Return the state of the sensor."""
         return self._easyConnector.SupplyTemperature
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.SupplyTemperature
-
 
 class IndoorTemperatureSensor(SensorBase):
     device_class = SensorDeviceClass.TEMPERATURE
@@ -144,10 +192,11 @@ class IndoorTemperatureSensor(SensorBase):
     native_value = float
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"IndoorTemperature"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_IndoorTemperature"
         self._attr_name = f"{self._easyConnector.deviceModel} Indoor Temperature"
@@ -157,10 +206,6 @@ class IndoorTemperatureSensor(SensorBase):
         """Return the state of the sensor."""
         return self._easyConnector.IndoorTemperature
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.IndoorTemperature
-
 
 class ExhaustTemperatureSensor(SensorBase):
     device_class = SensorDeviceClass.TEMPERATURE
@@ -169,10 +214,11 @@ class ExhaustTemperatureSensor(SensorBase):
     native_value = float
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"ExhaustTemperature"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
         # As per the sensor, this must be a unique value within this domain. This is done
         # by using the device ID, and appending "_battery"
         self._attr_unique_id = f"{self._easyConnector.serialNR}_ExhaustTemperature"
@@ -185,10 +231,6 @@ class ExhaustTemperatureSensor(SensorBase):
         """Return the state of the sensor."""
         return self._easyConnector.ExhaustTemperature
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.ExhaustTemperature
-
 
 class CO2Sensor(SensorBase):
     device_class = SensorDeviceClass.CO2
@@ -197,10 +239,11 @@ class CO2Sensor(SensorBase):
     native_value = int
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"CO2Value"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
         # As per the sensor, this must be a unique value within this domain. This is done
         # by using the device ID, and appending "_battery"
         self._attr_unique_id = f"{self._easyConnector.serialNR}_CO2Value"
@@ -211,24 +254,15 @@ class CO2Sensor(SensorBase):
     @property
     def state(self):
         """Return the state of the sensor."""
-        if self._easyConnector.CO2Value == 0xFFFF:
+        if not self._easyConnector.HasCO2Sensor:
             return 0
         else:
             return self._easyConnector.CO2Value
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        if self._easyConnector.CO2Value == 0xFFFF:
-            self.native_value = 0
-        else:
-            self.native_value = self._easyConnector.CO2Value
-
     # If the sensor is not available the KWL reports FF FF, so this is used to set the sensor to be not available
     @property
     def available(self) -> bool:
-        return (
-            self._easyConnector.IsAvailable and self._easyConnector.CO2Value != 0xFFFF
-        )
+        return self._easyConnector.IsAvailable and self._easyConnector.HasCO2Sensor
 
 
 class CurrentFanSpeed(SensorBase):
@@ -239,10 +273,11 @@ class CurrentFanSpeed(SensorBase):
     native_value = int
     state_class = SensorStateClass.MEASUREMENT
     suggested_display_precision = 1
+    _registers = {"CurrentFanSpeed"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_CurrentFanSpeed"
         self._attr_name = f"{self._easyConnector.deviceModel} current Fan Speed"
@@ -256,17 +291,14 @@ class CurrentFanSpeed(SensorBase):
     def icon(self):
         return "mdi:fan"
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.CurrentFanSpeed
-
 
 class FilterChanged(SensorBase):
     device_class = SensorDeviceClass.DATE
+    _registers = {"FilterChangedDay", "FilterChangedMonth", "FilterChangedYear"}
 
-    def __init__(self, easyConnector):
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_filterChanged"
         self._attr_name = f"{self._easyConnector.deviceModel} last filter change"
@@ -280,17 +312,19 @@ class FilterChanged(SensorBase):
     def icon(self):
         return "mdi:calendar-sync-outline"
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.filterChanged
-
 
 class FilterDue(SensorBase):
     device_class = SensorDeviceClass.DATE
-
-    def __init__(self, easyConnector):
+    _registers = {
+        "FilterInterval",
+        "FilterChangedDay",
+        "FilterChangedMonth",
+        "FilterChangedYear",
+    }
+
+    def __init__(self, coordinator):
         """Initialize the sensor."""
-        super().__init__(easyConnector)
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_filterDue"
         self._attr_name = f"{self._easyConnector.deviceModel} next filter change"
@@ -304,6 +338,160 @@ class FilterDue(SensorBase):
     def icon(self):
         return "mdi:calendar-alert-outline"
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        self.native_value = self._easyConnector.filterDue
+
+class PollCycleTime(SensorBase):
+    device_class = SensorDeviceClass.DURATION
+    native_unit_of_measurement = UnitOfTime.SECONDS
+    state_class = SensorStateClass.MEASUREMENT
+    suggested_display_precision = 3
+    entity_category = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default = False
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"{self._easyConnector.serialNR}_pollCycleTime"
+        self._attr_name = f"{self._easyConnector.deviceModel} poll cycle time"
+
+    @property
+    def native_value(self):
+        """Time the last scheduled poll took."""
+        return self.coordinator.lastCycleTime
+
+    @property
+    def icon(self):
+        return "mdi:timer-outline"
+
+
+class HeatRecoveryEfficiency(SensorBase):
+    native_unit_of_measurement = PERCENTAGE
+    state_class = SensorStateClass.MEASUREMENT
+    suggested_display_precision = 1
+    _registers = {
+        "OutsideTemperature",
+        "SupplyTemperature",
+        "IndoorTemperature",
+        "CycleMode",
+    }
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"{self._easyConnector.serialNR}_heatRecoveryEfficiency"
+        self._attr_name = f"{self._easyConnector.deviceModel} heat recovery efficiency"
+
+    @property
+    def native_value(self):
+        """Supply side efficiency, unknown while the temperatures are too close."""
+        return self.coordinator.metrics.heatRecoveryEfficiency
+
+    @property
+    def icon(self):
+        return "mdi:heat-wave"
+
+
+# unit and device class of the statistics by measurement
+_METRIC_UNITS = {
+    "heatRecoveryEfficiency": (PERCENTAGE, None),
+    "indoorTemperature": (UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE),
+    "airRH": (PERCENTAGE, SensorDeviceClass.HUMIDITY),
+    "CO2Value": (CONCENTRATION_PARTS_PER_MILLION, SensorDeviceClass.CO2),
+}
+
+
+class DerivedMetricSensor(SensorBase):
+    """Rolling statistic (mean, minimum, maximum or rate) of a measurement."""
+
+    state_class = SensorStateClass.MEASUREMENT
+    suggested_display_precision = 1
+    entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, measurement, statistic, name):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._measurement = measurement
+        self._statistic = statistic
+
+        unit, deviceClass = _METRIC_UNITS[measurement]
+        if statistic == "rate":
+            # a rate of ppm/min has no device class
+            unit, deviceClass = f"{unit}/min", None
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = deviceClass
+        self._attr_unique_id = (
+            f"{self._easyConnector.serialNR}_{measurement}_{statistic}"
+        )
+        self._attr_name = f"{self._easyConnector.deviceModel} {name}"
+
+    @property
+    def native_value(self):
+        """Return the statistic over the last hour."""
+        return getattr(
+            self.coordinator.metrics.windows[self._measurement], self._statistic
+        )
+
+    @property
+    def icon(self):
+        return "mdi:chart-line"
+
+
+# further registers of the device, all disabled by default, the key is the register name
+REGISTER_SENSORS = (
+    SensorEntityDescription(
+        key="SupplyCellTemperature",
+        name="Supply Cell Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="BoostTimer",
+        name="intensive mode remaining time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        icon="mdi:timer-sand",
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="FireplaceTimer",
+        name="individual mode remaining time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        icon="mdi:timer-sand",
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="CycleState",
+        name="cycle state",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="CycleMode",
+        name="cycle mode",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+
+class RegisterSensor(SensorBase):
+    """Raw value of a register, see REGISTER_SENSORS."""
+
+    def __init__(self, coordinator, description: SensorEntityDescription):
+        """Initialize the sensor."""
+        self.entity_description = description
+        super().__init__(coordinator)
+        self._registers = {description.key}
+
+        self._attr_unique_id = f"{self._easyConnector.serialNR}_{description.key}"
+        self._attr_name = f"{self._easyConnector.deviceModel} {description.name}"
+
+    @property
+    def native_value(self):
+        """Return the value of the register."""
+        return self._easyConnector.registerValue(self.entity_description.key)
@@ -1,32 +1,26 @@
-from datetime import timedelta
-
 from homeassistant.components.switch import SwitchEntity
 
 from .const import DOMAIN
+from .entity import EasyControls3Entity
 from .KWLStates import KWLState
 
-SCAN_INTERVAL = timedelta(seconds=60)
-MIN_TIME_BETWEEN_SCANS = timedelta(seconds=30)
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
-    easyConnector = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    if easyConnector.serialNR is None:
-        await easyConnector.readCurrentData()
+    async_add_entities([KWLOnOffSwitch(coordinator)])
 
-    async_add_entities([KWLOnOffSwitch(easyConnector)])
 
+class KWLOnOffSwitch(EasyControls3Entity, SwitchEntity):
+    _registers = {"CycleMode"}
 
-class KWLOnOffSwitch(SwitchEntity):
-    def __init__(self, easyConnector):
-        self._easyConnector = easyConnector
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_OnOffSwitch"
         # The name of the entity
         self._attr_name = f"{self._easyConnector.deviceModel} On Off Switch"
 
-
     async def async_turn_on(self, **kwargs):
         await self._easyConnector.turnOffOn(requestTurnOff=False)
         self.IsOn = False
@@ -44,10 +38,6 @@ class KWLOnOffSwitch(SwitchEntity):
     def available(self) -> bool:
         return self._easyConnector.IsAvailable
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
-        # self.is_on = self._easyConnector.IsOn
-
     @property
     def name(self):
         return "KWL on off switch"
@@ -60,4 +50,4 @@ class KWLOnOffSwitch(SwitchEntity):
     @property
     def device_class(self):
         """Return the class of this device, from SwitchDeviceClass."""
-        return "switch"
\ No newline at end of file
+        return "switch"
@@ -1,26 +1,24 @@
-from datetime import time, timedelta
+from datetime import time
 
 from homeassistant.components.time import TimeEntity
+from homeassistant.core import callback
 
 from .const import DOMAIN
+from .entity import EasyControls3Entity
 from .KWLStates import KWLState
 
-SCAN_INTERVAL = timedelta(seconds=60)
-MIN_TIME_BETWEEN_SCANS = timedelta(seconds=30)
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
-    easyConnector = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    if easyConnector.serialNR is None:
-        await easyConnector.readCurrentData()
+    async_add_entities([IntensiveDuration(coordinator)])
 
-    async_add_entities([IntensiveDuration(easyConnector)])
 
+class IntensiveDuration(EasyControls3Entity, TimeEntity):
+    _registers = {"IntensivDuration"}
 
-class IntensiveDuration(TimeEntity):
-    def __init__(self, easyConnector):
-        self._easyConnector = easyConnector
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
 
         self._attr_unique_id = f"{self._easyConnector.serialNR}_intensiveDuration"
 
@@ -42,9 +40,10 @@ class IntensiveDuration(TimeEntity):
     def available(self) -> bool:
         return self._easyConnector.IsAvailable
 
-    async def async_update(self):
-        await self._easyConnector.readCurrentData()
+    @callback
+    def _handle_coordinator_update(self) -> None:
         self.native_value = self._easyConnector.IntensivDuration
+        super()._handle_coordinator_update()
 
     @property
     def name(self):
@@ -0,0 +1,308 @@
+"""Benchmarks for importing, decoding, encoding and polling.
+
+Reports throughput and p50/p95/p99 latency and compares the p95 against a
+budget, run with: python -m tests.benchmarks
+The exit code is 1 if a benchmark is over its budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import compileall
+import os
+import pathlib
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+)
+from custom_components.EasyControls3_homeassistant.FrameEncoder import (
+    ACKNOWLEDGE_FRAME,
+    A_CYC_HOME_SPEED_SETTING,
+    encodeWriteFrame,
+)
+from custom_components.EasyControls3_homeassistant.KWLStates import KWLState
+
+from .simulator import DeviceSimulator
+
+# p95 budgets in microseconds, generous enough for slow CI machines
+BUDGETS = {
+    "import": 15000,
+    "parse": 100,
+    "parseUnchanged": 30,
+    "batchDecode1000": 5000,
+    "encode": 20,
+    "setFanSpeed": 500,
+    "switchMode": 500,
+    "poll": 20000,
+}
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    iterations: int
+    total: float  # seconds
+    p50: float  # microseconds
+    p95: float
+    p99: float
+
+    @property
+    def throughput(self):
+        return self.iterations / self.total if self.total else float("inf")
+
+    @property
+    def budget(self):
+        return BUDGETS.get(self.name)
+
+    def isWithinBudget(self, factor: float = 1.0):
+        return self.budget is None or self.p95 <= self.budget * factor
+
+    @property
+    def withinBudget(self):
+        return self.isWithinBudget()
+
+    def __str__(self):
+        budget = "-" if self.budget is None else f"{self.budget}"
+        state = "ok" if self.withinBudget else "OVER BUDGET"
+        return (
+            f"{self.name:<15} {self.iterations:>7} {self.throughput:>12.0f}/s "
+            f"p50 {self.p50:>9.1f}us p95 {self.p95:>9.1f}us p99 {self.p99:>9.1f}us "
+            f"budget {budget}us {state}"
+        )
+
+
+def _result(name, durations):
+    durations = sorted(durations)
+    quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return BenchmarkResult(
+        name,
+        len(durations),
+        sum(durations) / 1e9,
+        quantiles[49] / 1e3,
+        quantiles[94] / 1e3,
+        quantiles[98] / 1e3,
+    )
+
+
+ROOT = pathlib.Path(__file__).parent.parent
+PACKAGE = "custom_components.EasyControls3_homeassistant"
+# loaded by Home Assistant before it sets up the integration
+HA_MODULES = (
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.number",
+    "homeassistant.components.select",
+    "homeassistant.components.sensor",
+    "homeassistant.components.switch",
+    "homeassistant.components.time",
+)
+INTEGRATION_MODULES = (
+    PACKAGE,
+    *(
+        f"{PACKAGE}.{platform}"
+        for platform in ("number", "select", "sensor", "switch", "time")
+    ),
+    f"{PACKAGE}.config_flow",
+)
+_IMPORT_MARKER = "-- integration --"
+
+
+def _importTime(output: str) -> int:
+    """Sum of the import times (in us) of -X importtime output after the marker."""
+    total = 0
+    lines = output.splitlines()
+    for line in lines[lines.index(_IMPORT_MARKER) + 1 :]:
+        if line.startswith("import time:"):
+            total += int(line.split(":", 1)[1].split("|")[0])
+    return total
+
+
+def benchmarkImport(iterations: int = 5):
+    """Import time of the integration on top of what Home Assistant has loaded."""
+    # like an installed integration, with the byte code cached
+    compileall.compile_dir(ROOT / "custom_components", quiet=1)
+    script = "\n".join(
+        (
+            "import importlib, sys",
+            *(f"import {module}" for module in HA_MODULES),
+            f"print({_IMPORT_MARKER!r}, file=sys.stderr, flush=True)",
+            *(f"importlib.import_module({module!r})" for module in INTEGRATION_MODULES),
+        )
+    )
+    durations = []
+    for _ in range(iterations):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=ROOT,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        durations.append(_importTime(process.stderr) * 1000)
+    return _result("import", durations)
+
+
+def capturedFrames(count: int = 64, seed: int = 1):
+    """Status frames with varying measurements like a day of polling produces."""
+    generator = random.Random(seed)
+    simulator = DeviceSimulator()
+    frames = []
+    for _ in range(count):
+        simulator.setValue("IndoorTemperature", round(generator.uniform(18, 24), 1))
+        simulator.setValue("OutsideTemperature", round(generator.uniform(-10, 30), 1))
+        simulator.setValue("SupplyTemperature", round(generator.uniform(15, 22), 1))
+        simulator.setValue("ExhaustTemperature", round(generator.uniform(0, 20), 1))
+        simulator.setValue("AirRH", generator.randrange(30, 70))
+        simulator.setValue("CO2Value", generator.randrange(400, 1500))
+        simulator.setValue("CurrentFanSpeed", generator.randrange(20, 100))
+        simulator.setValue("BoostTimer", generator.choice((0, 0, 0, 15)))
+        frames.append(bytes(simulator.image))
+    return frames
+
+
+def benchmarkParse(iterations: int = 5000):
+    frames = capturedFrames()
+    easyConnector = EasyControls3Instance("127.0.0.1")
+    durations = []
+    for index in range(iterations):
+        frame = frames[index % len(frames)]
+        start = time.perf_counter_ns()
+        easyConnector._parseData(frame)
+        durations.append(time.perf_counter_ns() - start)
+    return _result("parse", durations)
+
+
+def benchmarkParseUnchanged(iterations: int = 5000):
+    """Steady state, the device reports the same frame again."""
+    frame = capturedFrames(1)[0]
+    easyConnector = EasyControls3Instance("127.0.0.1")
+    easyConnector._parseData(frame)
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        easyConnector._parseData(frame)
+        durations.append(time.perf_counter_ns() - start)
+    return _result("parseUnchanged", durations)
+
+
+def benchmarkBatchDecode(iterations: int = 50):
+    """Decoding 1000 captured frames at once, None without numpy."""
+    try:
+        from custom_components.EasyControls3_homeassistant.BatchDecoder import (
+            decodeFrames,
+        )
+
+        decodeFrames(capturedFrames(1))
+    except ImportError:
+        return None
+
+    frames = (capturedFrames() * 16)[:1000]
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        decodeFrames(frames)
+        durations.append(time.perf_counter_ns() - start)
+    return _result("batchDecode1000", durations)
+
+
+def benchmarkEncode(iterations: int = 5000):
+    # without the frame cache, so every frame is really encoded
+    encode = encodeWriteFrame.__wrapped__
+    durations = []
+    for index in range(iterations):
+        writes = ((A_CYC_HOME_SPEED_SETTING, index % 100 + 1),)
+        start = time.perf_counter_ns()
+        encode(writes)
+        durations.append(time.perf_counter_ns() - start)
+    return _result("encode", durations)
+
+
+async def _benchmarkSetter(name, setter, iterations):
+    """Time a setter including the write queue, without a device."""
+    easyConnector = EasyControls3Instance("127.0.0.1", writeCoalesceWindow=0)
+
+    async def exchangeData(request, isExpected=None, strict=True):
+        return ACKNOWLEDGE_FRAME
+
+    easyConnector._exchangeData = exchangeData
+    durations = []
+    for index in range(iterations):
+        start = time.perf_counter_ns()
+        await setter(easyConnector, index)
+        durations.append(time.perf_counter_ns() - start)
+    return _result(name, durations)
+
+
+async def benchmarkSetFanSpeed(iterations: int = 2000):
+    async def setter(easyConnector, index):
+        await easyConnector.setFanSpeed(index % 100 + 1, KWLState.AtHome)
+
+    return await _benchmarkSetter("setFanSpeed", setter, iterations)
+
+
+async def benchmarkSwitchMode(iterations: int = 2000):
+    modes = (KWLState.AtHome, KWLState.Away, KWLState.Individual)
+
+    async def setter(easyConnector, index):
+        await easyConnector.switchMode(modes[index % len(modes)])
+
+    return await _benchmarkSetter("switchMode", setter, iterations)
+
+
+async def benchmarkPoll(iterations: int = 500):
+    """Full readCurrentData round trips against the simulated device."""
+    async with DeviceSimulator() as simulator:
+        easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+        # the first read includes the connect
+        await easyConnector.readCurrentData(force=True)
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            await easyConnector.readCurrentData(force=True)
+            durations.append(time.perf_counter_ns() - start)
+        await easyConnector.close()
+    return _result("poll", durations)
+
+
+async def runAll(scale: float = 1.0):
+    def iterations(default):
+        return max(100, int(default * scale))
+
+    results = [
+        # every run starts Python and imports Home Assistant
+        benchmarkImport(max(2, round(5 * scale))),
+        benchmarkParse(iterations(5000)),
+        benchmarkParseUnchanged(iterations(5000)),
+        benchmarkBatchDecode(max(2, round(50 * scale))),
+        benchmarkEncode(iterations(5000)),
+        await benchmarkSetFanSpeed(iterations(2000)),
+        await benchmarkSwitchMode(iterations(2000)),
+        await benchmarkPoll(iterations(500)),
+    ]
+    return [result for result in results if result is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="factor for the number of iterations"
+    )
+    arguments = parser.parse_args()
+
+    results = asyncio.run(runAll(arguments.scale))
+    for result in results:
+        print(result)
+    return 0 if all(result.withinBudget for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
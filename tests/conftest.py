@@ -2,8 +2,17 @@
 
 import pytest
 
+from .simulator import DeviceSimulator
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     """Enable custom integrations."""
     return
+
+
+@pytest.fixture
+async def simulator(socket_enabled):
+    """Start a simulated device on a free local port."""
+    async with DeviceSimulator(seed=42) as simulator:
+        yield simulator
@@ -0,0 +1,275 @@
+"""Local stand-in for an EasyControls 3 device.
+
+Answers status reads and register writes over a websocket like the device does,
+with configurable latency, jitter, dropped and malformed replies, unsolicited
+garbage frames, and it can go offline leaving its connections half-open.
+
+Run it standalone with: python -m tests.simulator --port 8080
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import struct
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from custom_components.EasyControls3_homeassistant.FrameEncoder import (
+    ACKNOWLEDGE_FRAME,
+    READ_TABLE,
+    WRITE_DATA,
+    checksum,
+)
+from custom_components.EasyControls3_homeassistant.RegisterMap import (
+    REGISTERS_BY_ADDRESS,
+    STATUS_REGISTERS,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+REGISTER_COUNT = 700
+
+# a KWL 200 W L at home with a CO2 sensor
+DEFAULT_VALUES = {
+    "SerialNR": 4711,
+    "DeviceType": 3,
+    "DeviceModel": 44,
+    "CurrentFanSpeed": 40,
+    "AwayFanSpeed": 30,
+    "AtHomeFanSpeed": 50,
+    "IntensivFanSpeed": 90,
+    "IndoorTemperature": 21.5,
+    "ExhaustTemperature": 8.0,
+    "OutsideTemperature": 5.0,
+    "SupplyTemperature": 19.0,
+    "SupplyCellTemperature": 17.0,
+    "AirRH": 45,
+    "CO2Value": 650,
+    "CycleState": 0,
+    "CycleMode": 0,
+    "BoostTimer": 0,
+    "FireplaceTimer": 0,
+    "FilterInterval": 90,
+    "FilterChangedDay": 3,
+    "FilterChangedMonth": 2,
+    "FilterChangedYear": 24,
+    "IntensivDuration": 30,
+}
+
+_REGISTERS_BY_NAME = {register.name: register for register in STATUS_REGISTERS}
+_WIDTH_FORMATS = {1: "B", 2: "H", 4: "I"}
+
+
+def parseFrame(frame: bytes):
+    """Return (command, payload words) of a request frame or None if it is invalid."""
+    if len(frame) < 6 or len(frame) % 2:
+        return None
+    words = struct.unpack(f"<{len(frame) // 2}H", frame)
+    if words[0] != len(words) - 1 or checksum(words[:-1]) != words[-1]:
+        return None
+    return words[1], words[2:-1]
+
+
+class DeviceSimulator:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        dropRate: float = 0.0,
+        malformedRate: float = 0.0,
+        garbageRate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.dropRate = dropRate
+        self.malformedRate = malformedRate
+        self.garbageRate = garbageRate
+        self.image = bytearray(REGISTER_COUNT * 2)
+        self.reads = 0
+        self.writes = []
+        self.connections = 0
+        self.dropped = 0
+        self.malformed = 0
+        self.garbage = 0
+        self.ignored = 0  # requests received while offline
+        self.readOnly = (
+            set()
+        )  # names of registers whose writes are acknowledged but not taken
+        self._random = random.Random(seed)
+        self._server = None
+        self._websockets = set()
+        self._online = asyncio.Event()
+        self._online.set()
+        for name, value in DEFAULT_VALUES.items():
+            self.setValue(name, value)
+
+    def setValue(self, name: str, value):
+        """Set a register of the status frame, scaled values are given decoded."""
+        register = _REGISTERS_BY_NAME[name]
+        if register.isScaled:
+            value = round((value - register.bias) * register.scale)
+        fmt = ">" + _WIDTH_FORMATS[register.width]
+        if register.signed:
+            fmt = fmt.lower()
+        struct.pack_into(fmt, self.image, register.offset, value)
+
+    def getValue(self, name: str):
+        register = _REGISTERS_BY_NAME[name]
+        fmt = ">" + _WIDTH_FORMATS[register.width]
+        if register.signed:
+            fmt = fmt.lower()
+        (value,) = struct.unpack_from(fmt, self.image, register.offset)
+        if register.isScaled:
+            value = round(value / register.scale + register.bias, register.precision)
+        return value
+
+    def _applyWrites(self, payload):
+        writes = tuple(zip(payload[0::2], payload[1::2]))
+        self.writes.append(writes)
+        for address, value in writes:
+            register = REGISTERS_BY_ADDRESS.get(address)
+            if register is None:
+                LOGGER.debug(f"write to unknown register {address:#06x}")
+                continue
+            if register.name in self.readOnly:
+                continue
+            if register.width == 1:
+                value &= 0xFF
+            self.setValue(register.name, value)
+
+    def _answer(self, request: bytes):
+        parsed = parseFrame(request)
+        if parsed is None:
+            LOGGER.debug(f"ignoring invalid frame {request.hex()}")
+            return None
+        command, payload = parsed
+        if command == READ_TABLE:
+            self.reads += 1
+            return bytes(self.image)
+        if command == WRITE_DATA:
+            self._applyWrites(payload)
+            return ACKNOWLEDGE_FRAME
+        return None
+
+    async def _handler(self, websocket):
+        self.connections += 1
+        self._websockets.add(websocket)
+        try:
+            async for request in websocket:
+                if self.latency or self.jitter:
+                    await asyncio.sleep(
+                        max(
+                            0.0,
+                            self.latency
+                            + self._random.uniform(-self.jitter, self.jitter),
+                        )
+                    )
+                if not self._online.is_set():
+                    self.ignored += 1
+                    continue
+                if self._random.random() < self.dropRate:
+                    self.dropped += 1
+                    continue
+                response = self._answer(request)
+                if response is None:
+                    continue
+                if self._random.random() < self.garbageRate:
+                    # an extra frame nobody asked for, ahead of the answer
+                    self.garbage += 1
+                    await websocket.send(
+                        self._random.randbytes(self._random.randrange(1, 64))
+                    )
+                if self._random.random() < self.malformedRate:
+                    self.malformed += 1
+                    response = self._random.randbytes(self._random.randrange(1, 64))
+                await websocket.send(response)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._websockets.discard(websocket)
+
+    async def _processRequest(self, connection, request):
+        # while offline the handshake never completes, like a host that is gone
+        await self._online.wait()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening, returns the port."""
+        self._server = await serve(
+            self._handler,
+            host,
+            port,
+            compression=None,
+            process_request=self._processRequest,
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            # pending handshakes must not keep the server from closing
+            self._online.set()
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def disconnectAll(self):
+        """Close all open connections, like a rebooting device would."""
+        await asyncio.gather(
+            *(websocket.close() for websocket in list(self._websockets)),
+            return_exceptions=True,
+        )
+
+    def setOnline(self, isOnline: bool):
+        """Take the device off or back on the network.
+
+        Offline the open connections are left half-open (nothing is answered or
+        closed) and new connections hang in the handshake.
+        """
+        if isOnline:
+            self._online.set()
+        else:
+            self._online.clear()
+
+    @property
+    def isOnline(self):
+        return self._online.is_set()
+
+    async def __aenter__(self):
+        self.port = await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+async def _main(arguments):
+    simulator = DeviceSimulator(
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        dropRate=arguments.drop_rate,
+        malformedRate=arguments.malformed_rate,
+        garbageRate=arguments.garbage_rate,
+    )
+    port = await simulator.start(arguments.host, arguments.port)
+    LOGGER.info(f"simulating an EasyControls 3 device on ws://{arguments.host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--garbage-rate", type=float, default=0.0)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,399 @@
+"""Soak and fault-injection load test.
+
+Polls many instances against simulated devices for a while, injects latency,
+disconnects, half-open connections and garbage frames, and reports event loop
+lag, memory, open sockets and the share of successful polls per window.
+Run with: python -m tests.soak --devices 50 --duration 600
+The exit code is 1 if a limit is exceeded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import gc
+import logging
+import os
+import random
+import statistics
+import time
+from typing import NamedTuple
+
+from custom_components.EasyControls3_homeassistant.CircuitBreaker import CircuitBreaker
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+)
+from custom_components.EasyControls3_homeassistant.EasyControls3Session import (
+    EasyControls3Session,
+)
+from custom_components.EasyControls3_homeassistant.entity import EasyControls3Entity
+
+from .simulator import DeviceSimulator
+
+FAULTS = ("latency", "disconnect", "halfOpen", "garbage")
+
+
+def _entityRegisters():
+    """The registers of the entity classes of all platforms.
+
+    Entities without own registers (written on every update) and the register
+    sensors (disabled by default) are left out.
+    """
+    # the platforms are imported for their entity classes
+    from custom_components.EasyControls3_homeassistant import (  # noqa: F401
+        number,
+        select,
+        sensor,
+        switch,
+        time,
+    )
+
+    registers = []
+    classes = [EasyControls3Entity]
+    while classes:
+        entityClass = classes.pop()
+        classes.extend(entityClass.__subclasses__())
+        if entityClass._registers is not None:
+            registers.append(frozenset(entityClass._registers))
+    return tuple(registers)
+
+
+# registers shown by the entities of a device
+ENTITY_REGISTERS = _entityRegisters()
+
+
+@dataclasses.dataclass
+class SoakSettings:
+    devices: int = 20
+    duration: float = 60  # seconds
+    window: float = 10  # seconds per reported line
+    pollInterval: float = 0.5
+    faultInterval: float = 1.0  # a fault is injected this often
+    faultDuration: float = 2.0
+    timeout: float = 0.5  # connect and response timeout of the sessions
+    lagInterval: float = 0.02
+    seed: int = 1
+    # limits
+    maxLag: float = 0.1  # seconds
+    minSuccessRate: float = 0.5
+    maxMemoryGrowth: float = 20  # MB between the first and the last window
+    maxSocketsPerDevice: int = 4
+
+
+class WindowReport(NamedTuple):
+    end: float  # seconds since the start
+    polls: int
+    successRate: float | None
+    staleReads: int  # answers to an earlier request
+    lagP50: float  # milliseconds
+    lagP99: float
+    lagMax: float
+    memory: float | None  # MB resident
+    sockets: int | None
+
+    def __str__(self):
+        successRate = "-" if self.successRate is None else f"{self.successRate:6.1%}"
+        memory = "-" if self.memory is None else f"{self.memory:7.1f}MB"
+        sockets = "-" if self.sockets is None else f"{self.sockets:>5}"
+        return (
+            f"{self.end:>7.1f}s polls {self.polls:>6} success {successRate} "
+            f"stale {self.staleReads:>4} "
+            f"lag p50 {self.lagP50:>6.1f}ms p99 {self.lagP99:>6.1f}ms "
+            f"max {self.lagMax:>6.1f}ms "
+            f"memory {memory} sockets {sockets}"
+        )
+
+
+@dataclasses.dataclass
+class SoakReport:
+    settings: SoakSettings
+    windows: list = dataclasses.field(default_factory=list)
+    faults: dict = dataclasses.field(default_factory=dict)
+    socketsBefore: int | None = None
+    socketsAfter: int | None = None
+
+    @property
+    def problems(self):
+        """Descriptions of the exceeded limits, empty if all are kept."""
+        settings = self.settings
+        problems = []
+        maxLag = max(window.lagMax for window in self.windows) / 1e3
+        if maxLag > settings.maxLag:
+            problems.append(f"event loop lag of {maxLag * 1e3:.0f}ms")
+        polls = sum(window.polls for window in self.windows)
+        successes = sum(
+            window.polls * window.successRate for window in self.windows if window.polls
+        )
+        if polls and successes / polls < settings.minSuccessRate:
+            problems.append(f"only {successes / polls:.1%} of the polls succeeded")
+        staleReads = sum(window.staleReads for window in self.windows)
+        if staleReads:
+            problems.append(f"{staleReads} answers to earlier requests")
+        memories = [
+            window.memory for window in self.windows if window.memory is not None
+        ]
+        if len(memories) >= 2 and memories[-1] - memories[0] > settings.maxMemoryGrowth:
+            problems.append(f"memory grew by {memories[-1] - memories[0]:.1f}MB")
+        sockets = [
+            window.sockets for window in self.windows if window.sockets is not None
+        ]
+        if sockets and self.socketsBefore is not None:
+            limit = self.socketsBefore + settings.devices * settings.maxSocketsPerDevice
+            if max(sockets) > limit:
+                problems.append(f"{max(sockets)} open sockets")
+        if self.socketsAfter is not None and self.socketsAfter > self.socketsBefore:
+            problems.append(
+                f"{self.socketsAfter - self.socketsBefore} sockets left open"
+            )
+        return problems
+
+
+def residentMemory():
+    """Resident memory of the process in MB, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def openSockets():
+    """Number of open sockets of the process, None where /proc is not available."""
+    try:
+        descriptors = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    count = 0
+    for descriptor in descriptors:
+        try:
+            if os.readlink(f"/proc/self/fd/{descriptor}").startswith("socket:"):
+                count += 1
+        except OSError:
+            pass  # closed in between
+    return count
+
+
+class LagMonitor:
+    """Measures how late the event loop runs a task which sleeps lagInterval."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self.lags = []  # seconds
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self.lags.append(max(0.0, loop.time() - start - self._interval))
+
+    def takeLags(self):
+        lags, self.lags = self.lags, []
+        return lags
+
+
+class Device:
+    """A simulated device and the instance polling it."""
+
+    def __init__(
+        self, simulator: DeviceSimulator, easyConnector: EasyControls3Instance
+    ):
+        self.simulator = simulator
+        self.easyConnector = easyConnector
+        self.polls = 0
+        self.successes = 0
+        self.staleReads = 0
+        self.stateWrites = 0
+
+    async def poll(self, settings: SoakSettings, random: random.Random):
+        # spread the polls like the PollScheduler does
+        await asyncio.sleep(random.uniform(0, settings.pollInterval))
+        while True:
+            # a new value per poll, an answer to an earlier request shows an old one
+            fanSpeed = self.polls % 100 + 1
+            self.simulator.setValue("CurrentFanSpeed", fanSpeed)
+            lastUpdate = self.easyConnector.lastUpdate
+            await self.easyConnector.readCurrentData(force=True)
+            self.polls += 1
+            if self.easyConnector.lastUpdate is not lastUpdate:
+                self.successes += 1
+                if self.easyConnector.CurrentFanSpeed != fanSpeed:
+                    self.staleReads += 1
+            self._updateEntities()
+            await asyncio.sleep(settings.pollInterval)
+
+    def _updateEntities(self):
+        # what the entities do per coordinator update, without Home Assistant
+        changed = self.easyConnector.changedRegisters
+        state = self.easyConnector.state
+        for registers in ENTITY_REGISTERS:
+            if changed is None or not changed.isdisjoint(registers):
+                self.stateWrites += 1
+                dataclasses.astuple(state)
+
+
+async def _injectFault(device: Device, fault: str, settings: SoakSettings):
+    simulator = device.simulator
+    if fault == "disconnect":
+        await simulator.disconnectAll()
+        return
+    if fault == "latency":
+        # longer than the response timeout, the answers arrive too late
+        simulator.latency = settings.timeout * 2
+    elif fault == "halfOpen":
+        simulator.setOnline(False)
+    elif fault == "garbage":
+        simulator.garbageRate = 0.5
+    try:
+        await asyncio.sleep(settings.faultDuration)
+    finally:
+        simulator.latency = 0.0
+        simulator.setOnline(True)
+        simulator.garbageRate = 0.0
+
+
+async def _injectFaults(
+    devices, settings: SoakSettings, random: random.Random, counts: dict
+):
+    tasks = set()
+    try:
+        while True:
+            await asyncio.sleep(settings.faultInterval)
+            device = random.choice(devices)
+            fault = random.choice(FAULTS)
+            counts[fault] = counts.get(fault, 0) + 1
+            task = asyncio.create_task(_injectFault(device, fault, settings))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _totals(devices):
+    return (
+        sum(device.polls for device in devices),
+        sum(device.successes for device in devices),
+        sum(device.staleReads for device in devices),
+    )
+
+
+def _windowReport(end, totals, previousTotals, lags):
+    polls, successes, staleReads = (
+        total - previous for total, previous in zip(totals, previousTotals)
+    )
+    lags = sorted(lags) or [0.0]
+    if len(lags) > 1:
+        quantiles = statistics.quantiles(lags, n=100, method="inclusive")
+    else:
+        quantiles = lags * 99
+    return WindowReport(
+        end,
+        polls,
+        successes / polls if polls else None,
+        staleReads,
+        quantiles[49] * 1e3,
+        quantiles[98] * 1e3,
+        lags[-1] * 1e3,
+        residentMemory(),
+        openSockets(),
+    )
+
+
+def _createDevice(simulator, settings: SoakSettings):
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    # short timeouts and retry delays, so a soak of minutes sees many recoveries
+    easyConnector._session = EasyControls3Session(
+        easyConnector.url,
+        connectTimeout=settings.timeout,
+        responseTimeout=settings.timeout,
+        breaker=CircuitBreaker(
+            baseDelay=settings.timeout, maxDelay=settings.faultDuration
+        ),
+    )
+    return Device(simulator, easyConnector)
+
+
+async def runSoak(settings: SoakSettings, report=print) -> SoakReport:
+    """Run the soak test, report(window) is called after every window."""
+    generator = random.Random(settings.seed)
+    result = SoakReport(settings)
+    gc.collect()
+    result.socketsBefore = openSockets()
+
+    simulators = [
+        DeviceSimulator(seed=settings.seed + index) for index in range(settings.devices)
+    ]
+    for simulator in simulators:
+        simulator.port = await simulator.start()
+    devices = [_createDevice(simulator, settings) for simulator in simulators]
+
+    monitor = LagMonitor(settings.lagInterval)
+    tasks = [
+        asyncio.create_task(monitor.run()),
+        *(asyncio.create_task(device.poll(settings, generator)) for device in devices),
+        asyncio.create_task(_injectFaults(devices, settings, generator, result.faults)),
+    ]
+    try:
+        start = time.monotonic()
+        previousTotals = _totals(devices)
+        while time.monotonic() - start < settings.duration:
+            await asyncio.sleep(min(settings.window, settings.duration))
+            totals = _totals(devices)
+            window = _windowReport(
+                time.monotonic() - start, totals, previousTotals, monitor.takeLags()
+            )
+            previousTotals = totals
+            result.windows.append(window)
+            report(window)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for device in devices:
+            await device.easyConnector.close()
+        for simulator in simulators:
+            await simulator.stop()
+
+    gc.collect()
+    result.socketsAfter = openSockets()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = SoakSettings()
+    parser.add_argument("--devices", type=int, default=defaults.devices)
+    parser.add_argument(
+        "--duration", type=float, default=defaults.duration, help="seconds"
+    )
+    parser.add_argument("--window", type=float, default=defaults.window, help="seconds")
+    parser.add_argument("--poll-interval", type=float, default=defaults.pollInterval)
+    parser.add_argument("--fault-interval", type=float, default=defaults.faultInterval)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    arguments = parser.parse_args()
+
+    settings = SoakSettings(
+        devices=arguments.devices,
+        duration=arguments.duration,
+        window=arguments.window,
+        pollInterval=arguments.poll_interval,
+        faultInterval=arguments.fault_interval,
+        seed=arguments.seed,
+    )
+    logging.basicConfig(level=logging.WARNING)
+    # the simulators log every handshake a half-open fault lets time out
+    logging.getLogger("websockets").setLevel(logging.CRITICAL)
+    result = asyncio.run(runSoak(settings))
+    print(f"faults injected: {result.faults}")
+    print(f"sockets before {result.socketsBefore}, after {result.socketsAfter}")
+    for problem in result.problems:
+        print(f"LIMIT EXCEEDED: {problem}")
+    return 1 if result.problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
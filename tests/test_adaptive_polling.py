@@ -0,0 +1,92 @@
+"""Test the poll interval follows the state of the device."""
+
+import datetime
+from types import SimpleNamespace
+
+from custom_components.EasyControls3_homeassistant.AdaptivePolling import (
+    AdaptivePollInterval,
+)
+from custom_components.EasyControls3_homeassistant.DeviceState import NO_CO2_SENSOR
+from custom_components.EasyControls3_homeassistant.KWLStates import KWLState
+
+MIN = datetime.timedelta(seconds=10)
+MAX = datetime.timedelta(seconds=300)
+BASE = datetime.timedelta(seconds=60)
+
+
+def device(**values):
+    defaults = dict(
+        instanceState=KWLState.AtHome,
+        IsOn=True,
+        CurrentFanSpeed=40,
+        AtHomeFanSpeed=50,
+        AwayFanSpeed=30,
+        IntensivFanSpeed=90,
+        OutsideTemperature=5.0,
+        SupplyTemperature=19.0,
+        IndoorTemperature=21.5,
+        ExhaustTemperature=8.0,
+        AirRH=45,
+        CO2Value=650,
+        lastWrite=None,
+        retryIn=None,
+    )
+    defaults.update(values)
+    defaults["HasCO2Sensor"] = defaults["CO2Value"] != NO_CO2_SENSOR
+    return SimpleNamespace(**defaults)
+
+
+def test_backs_off_while_stable():
+    adaptive = AdaptivePollInterval(MIN, MAX, baseInterval=BASE)
+    intervals = [adaptive.next(device()) for _ in range(8)]
+
+    assert intervals[0] == BASE
+    assert intervals[1] == BASE * 1.5
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == MAX
+
+    # any change goes back to the base interval
+    assert adaptive.next(device(IndoorTemperature=21.6)) == BASE
+
+
+def test_fast_during_transitions():
+    adaptive = AdaptivePollInterval(MIN, MAX, baseInterval=BASE)
+    assert adaptive.next(device(instanceState=KWLState.Intensive)) == MIN
+    assert adaptive.next(device(lastWrite=datetime.datetime.now())) == MIN
+
+    adaptive.next(device(CO2Value=700))
+    assert adaptive.next(device(CO2Value=760)) == MIN
+    # 0xFFFF means there is no CO2 sensor
+    adaptive.next(device(CO2Value=NO_CO2_SENSOR))
+    assert adaptive.next(device(CO2Value=NO_CO2_SENSOR)) > MIN
+
+
+def test_co2_baseline_follows_the_polls():
+    adaptive = AdaptivePollInterval(MIN, MAX, baseInterval=BASE)
+    # the CO2 value rose during the intensive timer, that is no rise afterwards
+    adaptive.next(device(instanceState=KWLState.Intensive, CO2Value=600))
+    adaptive.next(device(instanceState=KWLState.Intensive, CO2Value=900))
+    assert adaptive.next(device(CO2Value=910)) == BASE
+
+    # changes between polls don't move the baseline
+    adaptive.next(device(CO2Value=600), isPoll=False)
+    assert adaptive.next(device(CO2Value=950)) == MIN
+
+
+def test_only_polls_count_as_stable():
+    adaptive = AdaptivePollInterval(MIN, MAX, baseInterval=BASE)
+    adaptive.next(device())
+    assert adaptive.next(device(), isPoll=False) == BASE
+    assert adaptive.next(device(), isPoll=False) == BASE
+    assert adaptive.next(device()) == BASE * 1.5
+
+
+def test_slow_while_off():
+    adaptive = AdaptivePollInterval(MIN, MAX, baseInterval=BASE)
+    assert adaptive.next(device(IsOn=False)) == MAX
+
+
+def test_waits_for_the_circuit_breaker():
+    interval = AdaptivePollInterval(MIN, MAX, BASE)
+    assert interval.next(device(retryIn=120.0)) == datetime.timedelta(seconds=120)
+    assert interval.next(device(retryIn=1000.0)) == MAX
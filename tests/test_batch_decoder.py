@@ -0,0 +1,48 @@
+"""Test the batch decoder gives the same values as the decoder of the integration."""
+
+import pytest
+
+from custom_components.EasyControls3_homeassistant.DeviceState import DeviceState
+from custom_components.EasyControls3_homeassistant.RegisterMap import STATUS_DECODER
+
+from .benchmarks import capturedFrames
+
+numpy = pytest.importorskip("numpy")
+
+from custom_components.EasyControls3_homeassistant.BatchDecoder import (  # noqa: E402
+    decodeFrames,
+    main,
+)
+
+
+def test_same_values_as_the_frame_decoder():
+    frames = capturedFrames(200)
+    columns = decodeFrames(frames)
+
+    assert columns["valid"].all()
+    for row, frame in enumerate(frames):
+        values = STATUS_DECODER.decode(frame)
+        for name, value in values.items():
+            assert columns[name][row] == value, name
+        state = DeviceState.fromValues(values, 1)
+        assert columns["KWLState"][row] == state.instanceState.value
+        assert columns["IsOn"][row] == state.isOn
+        assert columns["FilterDue"][row].item() == state.filterDue
+
+
+def test_short_frames_are_marked():
+    frames = [capturedFrames(1)[0], b"\x01\x02"]
+    columns = decodeFrames(frames)
+
+    assert columns["valid"].tolist() == [True, False]
+    assert numpy.isnat(columns["FilterChanged"][1])
+
+
+def test_command_line(tmp_path, capsys):
+    captures = tmp_path / "captures.txt"
+    captures.write_text("\n".join(frame.hex() for frame in capturedFrames(3)) + "\n")
+
+    assert main([str(captures)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("valid,SerialNR,")
+    assert len(lines) == 4
@@ -0,0 +1,60 @@
+"""Run the benchmarks, their budgets are only checked on request.
+
+Wall-clock budgets depend on the machine and its load, so a normal test run
+only checks the benchmarks work. Set CHECK_BENCHMARK_BUDGETS=1 to fail on a
+budget, or run python -m tests.benchmarks.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from .benchmarks import INTEGRATION_MODULES, ROOT, runAll
+
+# tracing for the coverage report makes everything a lot slower
+BUDGET_FACTOR = 5 if sys.gettrace() is not None else 1
+
+
+def _runBenchmarks():
+    # an own event loop, the one of the hass fixture runs in (slow) debug mode
+    return asyncio.run(runAll(scale=0.05))
+
+
+def test_benchmarks_run(socket_enabled):
+    results = _runBenchmarks()
+    assert {"parse", "encode", "poll"} <= {result.name for result in results}
+    assert all(result.iterations and result.p95 > 0 for result in results)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("CHECK_BENCHMARK_BUDGETS"),
+    reason="set CHECK_BENCHMARK_BUDGETS=1",
+)
+def test_benchmarks_within_budget(socket_enabled):
+    results = _runBenchmarks()
+    overBudget = [
+        str(result) for result in results if not result.isWithinBudget(BUDGET_FACTOR)
+    ]
+    assert not overBudget
+
+
+def test_no_transport_at_import():
+    """Test loading the integration does not import the websocket and date libraries."""
+    script = "; ".join(
+        (
+            "import importlib, sys",
+            *(f"importlib.import_module({module!r})" for module in INTEGRATION_MODULES),
+            "print(' '.join(sorted({'websockets', 'dateutil'} & sys.modules.keys())))",
+        )
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert process.stdout.strip() == ""
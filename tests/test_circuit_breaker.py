@@ -0,0 +1,125 @@
+"""Test an unreachable device is not contacted over and over."""
+
+import pytest
+
+from custom_components.EasyControls3_homeassistant.CircuitBreaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from custom_components.EasyControls3_homeassistant.EasyControls3Session import (
+    EasyControls3Session,
+    UnexpectedResponseError,
+)
+from custom_components.EasyControls3_homeassistant.FrameEncoder import (
+    A_CYC_HOME_SPEED_SETTING,
+    ACKNOWLEDGE_FRAME,
+    READ_STATUS_FRAME,
+    encodeWriteFrame,
+)
+from custom_components.EasyControls3_homeassistant.RegisterMap import STATUS_DECODER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_backs_off():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failureThreshold=2, baseDelay=10, maxDelay=30, jitter=0, clock=clock
+    )
+
+    breaker.recordFailure()
+    assert breaker.allowRequest()
+    breaker.recordFailure()
+    assert not breaker.allowRequest()
+    assert breaker.retryIn == 10
+
+    # one trial request after the delay, its failure doubles the delay
+    clock.now = 10
+    assert breaker.allowRequest()
+    assert not breaker.allowRequest()
+    breaker.recordFailure()
+    assert breaker.retryIn == 20
+
+    clock.now = 30
+    assert breaker.allowRequest()
+    breaker.recordFailure()
+    assert breaker.retryIn == 30
+
+    clock.now = 60
+    assert breaker.allowRequest()
+    breaker.recordSuccess()
+    assert not breaker.isOpen
+    assert breaker.allowRequest()
+
+
+def test_breaker_jitter():
+    delays = set()
+    for _ in range(20):
+        breaker = CircuitBreaker(
+            failureThreshold=1, baseDelay=100, jitter=0.2, clock=FakeClock()
+        )
+        breaker.recordFailure()
+        assert 80 <= breaker.retryIn <= 120
+        delays.add(breaker.retryIn)
+    assert len(delays) > 1
+
+
+async def test_session_times_out(simulator):
+    """Test a device which does not answer neither blocks nor is asked again at once."""
+    simulator.dropRate = 1.0
+    session = EasyControls3Session(
+        f"ws://127.0.0.1:{simulator.port}",
+        responseTimeout=0.05,
+        breaker=CircuitBreaker(failureThreshold=2, jitter=0),
+    )
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await session.exchange(READ_STATUS_FRAME)
+    with pytest.raises(CircuitOpenError):
+        await session.exchange(READ_STATUS_FRAME)
+    await session.close()
+
+    assert simulator.dropped == 2
+
+
+async def test_unexpected_response_is_a_failure(simulator):
+    """Test a stray frame is not returned as the answer and counts as a failure."""
+
+    def isStatusFrame(response):
+        return len(response) >= STATUS_DECODER.frameSize
+
+    session = EasyControls3Session(f"ws://127.0.0.1:{simulator.port}")
+    simulator.garbageRate = 1.0
+    with pytest.raises(UnexpectedResponseError):
+        await session.exchange(READ_STATUS_FRAME, isStatusFrame)
+    assert session.breaker.failures == 1
+    assert not session.isConnected
+
+    # the late answer on the old connection is not taken for the next one
+    simulator.garbageRate = 0.0
+    assert isStatusFrame(await session.exchange(READ_STATUS_FRAME, isStatusFrame))
+    assert session.breaker.failures == 0
+    await session.close()
+
+
+async def test_unexpected_write_answer_is_no_failure(simulator):
+    """Test a write answer other than the ACK drops the connection, is no failure."""
+
+    def isAcknowledge(response):
+        return response == ACKNOWLEDGE_FRAME
+
+    session = EasyControls3Session(f"ws://127.0.0.1:{simulator.port}")
+    simulator.garbageRate = 1.0
+    await session.exchange(
+        encodeWriteFrame(((A_CYC_HOME_SPEED_SETTING, 60),)), isAcknowledge, strict=False
+    )
+    assert session.breaker.failures == 0
+    assert not session.isConnected
+    await session.close()
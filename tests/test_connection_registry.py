@@ -0,0 +1,53 @@
+"""Test entries of the same host share one connection."""
+
+import asyncio
+
+import pytest
+
+from custom_components.EasyControls3_homeassistant.ConnectionRegistry import (
+    ConnectionRegistry,
+)
+
+
+async def test_shared_and_closed_with_the_last_user():
+    registry = ConnectionRegistry()
+    created = []
+    closed = []
+
+    async def create():
+        # a slow first read, the second entry has to wait for it
+        await asyncio.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    async def close(coordinator):
+        closed.append(coordinator)
+
+    first, second = await asyncio.gather(
+        registry.acquire("192.168.1.5", create),
+        registry.acquire("192.168.1.5 ", create),
+    )
+    assert first is second
+    assert len(created) == 1
+
+    await registry.release("192.168.1.5", close)
+    assert closed == []
+    await registry.release("192.168.1.5", close)
+    assert closed == [first]
+    assert registry.isEmpty
+
+
+async def test_failed_create_is_not_registered():
+    registry = ConnectionRegistry()
+
+    async def fail():
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        await registry.acquire("192.168.1.5", fail)
+    assert registry.isEmpty
+
+    async def create():
+        return "coordinator"
+
+    assert await registry.acquire("192.168.1.5", create) == "coordinator"
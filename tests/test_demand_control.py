@@ -0,0 +1,116 @@
+"""Test the fan speed follows the CO2 value and the humidity."""
+
+import asyncio
+
+from custom_components.EasyControls3_homeassistant.DemandControl import DemandControl
+from custom_components.EasyControls3_homeassistant.DeviceState import (
+    NO_CO2_SENSOR,
+    DeviceState,
+)
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+)
+from custom_components.EasyControls3_homeassistant.KWLStates import KWLState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def state(**values):
+    defaults = dict(
+        instanceState=KWLState.AtHome,
+        isOn=True,
+        atHomeFanSpeed=50,
+        CO2Value=600,
+        airRH=45,
+    )
+    defaults.update(values)
+    return DeviceState(**defaults)
+
+
+def test_hysteresis_and_rate_limit():
+    clock = FakeClock()
+    control = DemandControl(co2High=1000, co2Low=800, minInterval=300, clock=clock)
+
+    assert control.evaluate(state(CO2Value=950)) is None
+    assert control.evaluate(state(CO2Value=1000)) == 80
+    # between the thresholds nothing changes
+    assert control.evaluate(state(CO2Value=850, atHomeFanSpeed=80)) is None
+    # too early after the last change
+    clock.now = 100
+    assert control.evaluate(state(CO2Value=700, atHomeFanSpeed=80)) is None
+    clock.now = 300
+    assert control.evaluate(state(CO2Value=700, atHomeFanSpeed=80)) == 50
+    assert not control.isActive
+
+
+def test_manual_changes_are_kept():
+    clock = FakeClock()
+    control = DemandControl(rhHigh=70, rhLow=60, minInterval=0, clock=clock)
+
+    # only in the AtHome mode
+    assert control.evaluate(state(airRH=75, instanceState=KWLState.Away)) is None
+    assert control.evaluate(state(airRH=75)) == 80
+    # set by hand to another speed, which is not overwritten
+    assert control.evaluate(state(airRH=55, atHomeFanSpeed=65)) is None
+    assert not control.isActive
+
+
+def test_without_co2_sensor_only_the_humidity_counts():
+    control = DemandControl(co2High=1000, rhHigh=70, minInterval=0, clock=FakeClock())
+    assert control.evaluate(state(CO2Value=NO_CO2_SENSOR)) is None
+    assert control.evaluate(state(CO2Value=NO_CO2_SENSOR, airRH=75)) == 80
+
+
+async def test_instance_sets_fan_speed(simulator):
+    """Test a read with a high CO2 value raises the fan speed without an automation."""
+    easyConnector = EasyControls3Instance(
+        "127.0.0.1", writeCoalesceWindow=0.01, port=simulator.port
+    )
+    easyConnector.setDemandControl(DemandControl(minInterval=0))
+    await easyConnector.readCurrentData()
+
+    simulator.setValue("CO2Value", 1200)
+    await easyConnector.readCurrentData(force=True)
+    await asyncio.wait_for(easyConnector._demandControlTask, 1)
+
+    assert simulator.getValue("AtHomeFanSpeed") == 80
+    assert easyConnector.AtHomeFanSpeed == 80
+    assert easyConnector.demandRaisedFanSpeeds == (50, 80)
+
+    # nothing would lower the speed again after the demand control is gone
+    await easyConnector.close()
+    assert simulator.getValue("AtHomeFanSpeed") == 50
+
+
+def test_resumed_demand_is_ended():
+    control = DemandControl(co2Low=800, minInterval=0, clock=FakeClock())
+    control.resume(50, 80)
+    assert control.isActive
+    assert control.evaluate(state(CO2Value=1000, atHomeFanSpeed=80)) is None
+    assert control.evaluate(state(CO2Value=700, atHomeFanSpeed=80)) == 50
+    assert control.raisedFanSpeeds is None
+
+    # a speed changed by hand in between is kept
+    control.resume(50, 80)
+    assert control.release(state(atHomeFanSpeed=65)) is None
+
+
+async def test_demand_of_before_the_restart_is_ended(simulator):
+    """Test the speed is set back after a restart without demand control."""
+    simulator.setValue("AtHomeFanSpeed", 80)
+    easyConnector = EasyControls3Instance(
+        "127.0.0.1", writeCoalesceWindow=0.01, port=simulator.port
+    )
+    easyConnector.resumeDemandControl(50, 80)
+    await easyConnector.readCurrentData()
+    await asyncio.wait_for(easyConnector._demandControlTask, 1)
+    await easyConnector.close()
+
+    assert simulator.getValue("AtHomeFanSpeed") == 50
+    assert easyConnector.demandRaisedFanSpeeds is None
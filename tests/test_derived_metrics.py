@@ -0,0 +1,60 @@
+"""Test the values calculated from the measurements."""
+
+import random
+
+from custom_components.EasyControls3_homeassistant.DerivedMetrics import (
+    DerivedMetrics,
+    RollingWindow,
+)
+from custom_components.EasyControls3_homeassistant.DeviceState import (
+    NO_CO2_SENSOR,
+    DeviceState,
+)
+
+
+def test_rolling_window_matches_recalculation():
+    generator = random.Random(3)
+    window = RollingWindow(600)
+    samples = []
+    for timestamp in range(0, 3600, 30):
+        value = generator.randrange(400, 1500)
+        window.add(timestamp, value)
+        samples.append((timestamp, value))
+        inWindow = [value for time, value in samples if time >= timestamp - 600]
+
+        assert window.count == len(inWindow)
+        assert window.minimum == min(inWindow)
+        assert window.maximum == max(inWindow)
+        assert abs(window.mean - sum(inWindow) / len(inWindow)) < 1e-9
+
+
+def test_rolling_window_rate():
+    window = RollingWindow(3600)
+    assert window.rate is None
+    window.add(0, 500)
+    window.add(120, 560)
+    assert window.rate == 30
+
+
+def test_heat_recovery_efficiency():
+    metrics = DerivedMetrics()
+    state = DeviceState(
+        outsideTemperature=0.0, supplyTemperature=16.0, indoorTemperature=20.0, airRH=40
+    )
+    metrics.update(state, 0)
+    assert metrics.heatRecoveryEfficiency == 80.0
+
+    # the temperatures are too close for a meaningful value
+    closeState = DeviceState(
+        outsideTemperature=19.0, supplyTemperature=19.5, indoorTemperature=20.0
+    )
+    metrics.update(closeState, 60)
+    assert metrics.heatRecoveryEfficiency is None
+    assert metrics.windows["heatRecoveryEfficiency"].mean == 80.0
+
+    # the same read is counted once only
+    metrics.update(state, 60)
+    assert metrics.windows["indoorTemperature"].count == 2
+    # no CO2 sensor
+    metrics.update(DeviceState(CO2Value=NO_CO2_SENSOR), 120)
+    assert metrics.windows["CO2Value"].count == 0
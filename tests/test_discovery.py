@@ -0,0 +1,76 @@
+"""Test devices are found by scanning a network."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from homeassistant import config_entries, data_entry_flow
+
+from custom_components.EasyControls3_homeassistant.const import DOMAIN
+from custom_components.EasyControls3_homeassistant.Discovery import (
+    DiscoveredDevice,
+    discoverDevices,
+    identifyDevice,
+    probe,
+)
+
+
+async def test_discover_devices(simulator):
+    """Test only the simulated device is found in a small network."""
+    devices = await discoverDevices("127.0.0.0/29", port=simulator.port, timeout=0.5)
+    assert devices == [DiscoveredDevice("127.0.0.1", 4711, "KWL 200 W L", "3712")]
+
+
+async def test_probe_gives_up_after_timeout(simulator):
+    """Test a slow handshake and a slow answer together exceed the timeout."""
+    simulator.setOnline(False)
+    asyncio.get_running_loop().call_later(0.3, simulator.setOnline, True)
+    simulator.latency = 0.3
+
+    started = time.monotonic()
+    assert await probe("127.0.0.1", simulator.port, timeout=0.5) is None
+    assert time.monotonic() - started < 1.0
+
+
+def test_identify_device():
+    assert identifyDevice("10.0.0.1", b"\x00" * 10) is None
+    assert identifyDevice("10.0.0.1", "not a frame") is None
+
+
+async def test_discovery_flow(hass, simulator):
+    """Test a found device is added and the others are offered as discovered."""
+    found = [
+        DiscoveredDevice("127.0.0.1", 4711, "KWL 200 W L", "3722"),
+        DiscoveredDevice("127.0.0.2", 4712, "KWL 300 W R", "3702"),
+    ]
+
+    async def discover(network):
+        return found
+
+    with patch(
+        "custom_components.EasyControls3_homeassistant.config_flow.discoverDevices",
+        discover,
+    ), patch(
+        "custom_components.EasyControls3_homeassistant.async_setup_entry",
+        return_value=True,
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        assert result["type"] == data_entry_flow.FlowResultType.MENU
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"next_step_id": "discovery"}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"network": "127.0.0.0/24"}
+        )
+        assert result["step_id"] == "pick"
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"host": "127.0.0.1"}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["data"] == {"host": "127.0.0.1"}
+    flows = hass.config_entries.flow.async_progress()
+    assert [flow["context"]["unique_id"] for flow in flows] == ["4712"]
@@ -0,0 +1,55 @@
+"""Test the states of the entities are written when their values change."""
+
+import datetime
+import logging
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.EasyControls3_homeassistant.entity import EasyControls3Entity
+
+
+class Measurement(EasyControls3Entity):
+    _registers = frozenset({"IndoorTemperature"})
+    _isThrottled = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self.writtenValues = []
+
+    def async_write_ha_state(self):
+        self.writtenValues.append(self._easyConnector.IndoorTemperature)
+
+
+async def test_throttled_change_is_written_later(hass):
+    """Test a change within the interval is written once it is over."""
+    coordinator = DataUpdateCoordinator(hass, logging.getLogger(__name__), name="test")
+    coordinator.stateWriteInterval = 60
+    coordinator.easyConnector = SimpleNamespace(
+        changedRegisters=frozenset({"IndoorTemperature"}), IndoorTemperature=21.0
+    )
+    entity = Measurement(coordinator)
+    entity.hass = hass
+    now = dt_util.utcnow()
+
+    with patch(
+        "custom_components.EasyControls3_homeassistant.entity.time.monotonic"
+    ) as clock:
+        clock.return_value = 1000.0
+        entity._handle_coordinator_update()
+        clock.return_value = 1010.0
+        coordinator.easyConnector.IndoorTemperature = 21.5
+        entity._handle_coordinator_update()
+        # later polls without a change of the register
+        coordinator.easyConnector.changedRegisters = frozenset()
+        clock.return_value = 1030.0
+        entity._handle_coordinator_update()
+        assert entity.writtenValues == [21.0]
+
+        clock.return_value = 1060.0
+        async_fire_time_changed(hass, now + datetime.timedelta(seconds=61))
+        await hass.async_block_till_done()
+    assert entity.writtenValues == [21.0, 21.5]
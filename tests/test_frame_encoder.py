@@ -0,0 +1,80 @@
+"""Test the frames are the ones the integration always sent to the device."""
+
+import pytest
+
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+)
+from custom_components.EasyControls3_homeassistant.FrameEncoder import (
+    A_CYC_AWAY_SPEED_SETTING,
+    A_CYC_BOOST_SPEED_SETTING,
+    A_CYC_BOOST_TIME,
+    A_CYC_HOME_SPEED_SETTING,
+    A_CYC_MODE,
+    ACKNOWLEDGE_FRAME,
+    READ_STATUS_FRAME,
+    encodeWriteFrame,
+)
+from custom_components.EasyControls3_homeassistant.KWLStates import KWLState
+
+
+def littleEndian(value):
+    return value.to_bytes(2, byteorder="little").hex()
+
+
+def fanSpeedFrame(modeIdentifier, offset, speed):
+    return f"0400f900{modeIdentifier}50{speed:02x}00{speed + offset:02x}51"
+
+
+def test_fixed_frames():
+    assert READ_STATUS_FRAME.hex() == "0300f6000000f900"
+    assert ACKNOWLEDGE_FRAME.hex() == "0200f500f700"
+
+
+@pytest.mark.parametrize(
+    ("mode", "duration", "frame"),
+    [
+        (KWLState.AtHome, None, "0800f9000112000004120000051200000b37"),
+        (KWLState.Away, None, "0800f9000112010004120000051200000c37"),
+        (KWLState.Individual, None, "0600f90004120000051296009e25"),
+        (
+            KWLState.Intensive,
+            45,
+            "0600f9000412" + littleEndian(45) + "05120000" + littleEndian(45 + 0x2508),
+        ),
+        (
+            KWLState.Intensive,
+            1440,
+            "0600f9000412"
+            + littleEndian(1440)
+            + "05120000"
+            + littleEndian(1440 + 0x2508),
+        ),
+    ],
+)
+def test_mode_frames(mode, duration, frame):
+    easyConnector = EasyControls3Instance("127.0.0.1")
+    writes = easyConnector._modeWrites(mode, duration)
+    assert encodeWriteFrame(writes).hex() == frame
+
+
+@pytest.mark.parametrize(
+    ("writes", "frame"),
+    [
+        (((A_CYC_MODE, 5),), "0400f900021205000413"),
+        (((A_CYC_MODE, 0),), "0400f90002120000ff12"),
+        (((A_CYC_HOME_SPEED_SETTING, 60),), fanSpeedFrame("1b", 24, 60)),
+        (((A_CYC_AWAY_SPEED_SETTING, 20),), fanSpeedFrame("15", 18, 20)),
+        (((A_CYC_BOOST_SPEED_SETTING, 100),), fanSpeedFrame("21", 30, 100)),
+        (
+            ((A_CYC_BOOST_TIME, 1),),
+            "0400f9004050" + littleEndian(1) + littleEndian(1 + 0x513D),
+        ),
+        (
+            ((A_CYC_BOOST_TIME, 1440),),
+            "0400f9004050" + littleEndian(1440) + littleEndian(1440 + 0x513D),
+        ),
+    ],
+)
+def test_write_frames(writes, frame):
+    assert encodeWriteFrame(writes).hex() == frame
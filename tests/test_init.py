@@ -1,9 +1,33 @@
 """Test component setup."""
+
+from unittest.mock import patch
+
 from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.helios_easyControls_3.0_homeassistant.const import DOMAIN
+from custom_components.EasyControls3_homeassistant.const import DOMAIN
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+async def test_duplicate_entries_are_merged(hass):
+    """Test only the first entry of a host is kept."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, data={"host": host}, version=1, minor_version=1)
+        for host in ("192.168.1.5", "192.168.1.6", "192.168.1.5")
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.EasyControls3_homeassistant.async_setup_entry",
+        return_value=True,
+    ):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+    assert hass.config_entries.async_entries(DOMAIN) == entries[:2]
+    assert all(entry.minor_version == 2 for entry in entries[:2])
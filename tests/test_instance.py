@@ -0,0 +1,296 @@
+"""Test the communication with a (simulated) device."""
+
+import asyncio
+import dataclasses
+import datetime
+
+import pytest
+
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+    SettingsNotAppliedError,
+)
+from custom_components.EasyControls3_homeassistant.KWLStates import KWLState
+from custom_components.EasyControls3_homeassistant.RegisterMap import COLD
+
+
+def createInstance(simulator):
+    return EasyControls3Instance(
+        "127.0.0.1", writeCoalesceWindow=0.01, port=simulator.port
+    )
+
+
+async def test_read(simulator):
+    """Test the status frame is decoded."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    await easyConnector.close()
+
+    assert easyConnector.serialNR == 4711
+    assert easyConnector.deviceModel == "KWL 200 W L"
+    assert easyConnector.instanceState is KWLState.AtHome
+    assert easyConnector.IndoorTemperature == 21.5
+    assert easyConnector.AtHomeFanSpeed == 50
+    assert str(easyConnector.filterDue) == "2024-05-03"
+    assert easyConnector.IsAvailable
+
+
+async def test_writes_are_coalesced(simulator):
+    """Test a burst of writes is sent in one frame and read back."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+
+    await asyncio.gather(
+        *(easyConnector.setAtHomeFanSpeed(speed) for speed in range(60, 70)),
+        easyConnector.setAwayFanSpeed(20),
+    )
+    assert easyConnector.AtHomeFanSpeed == 69
+    await easyConnector.close()
+
+    assert len(simulator.writes) == 1
+    assert simulator.getValue("AtHomeFanSpeed") == 69
+    assert simulator.getValue("AwayFanSpeed") == 20
+    # one read for the start, one to verify the write
+    assert simulator.reads == 2
+    assert simulator.connections == 1
+
+
+async def test_reconnect(simulator):
+    """Test the session reconnects after the device closed the connection."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    await simulator.disconnectAll()
+
+    simulator.setValue("BoostTimer", 20)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.instanceState is KWLState.Intensive
+    assert simulator.connections == 2
+
+
+async def test_changed_registers(simulator):
+    """Test only the registers which changed between two frames are reported."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    assert easyConnector.changedRegisters is None
+
+    await easyConnector.readCurrentData(force=True)
+    assert easyConnector.changedRegisters == frozenset()
+
+    simulator.setValue("IndoorTemperature", 22.0)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.changedRegisters == {"IndoorTemperature"}
+    assert easyConnector.IndoorTemperature == 22.0
+
+
+async def test_cold_registers_are_checked_rarely(simulator):
+    """Test registers which hardly ever change are only checked after their period."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+
+    simulator.setValue("FilterInterval", 120)
+    simulator.setValue("AirRH", 50)
+    await easyConnector.readCurrentData(force=True)
+    assert easyConnector.changedRegisters == {"AirRH"}
+    assert easyConnector.filterInterval == 90
+
+    # pretend the cold registers were checked an hour ago
+    frame, checkedAt = easyConnector._checkedFrames[COLD]
+    easyConnector._checkedFrames[COLD] = (frame, checkedAt - COLD)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.changedRegisters == {"FilterInterval"}
+    assert easyConnector.filterInterval == 120
+
+
+async def test_restored_frame_is_not_taken_as_checked(simulator):
+    """Test the first read after a restored frame also checks the cold registers."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    frame = easyConnector.lastFrame
+    await easyConnector.close()
+
+    simulator.setValue("SerialNR", 4712)
+    simulator.setValue("FilterChangedDay", 20)
+    easyConnector = createInstance(simulator)
+    easyConnector.restoreFrame(frame)
+    assert easyConnector.serialNR == 4711
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.changedRegisters is None
+    assert easyConnector.serialNR == 4712
+    assert easyConnector.filterChanged.day == 20
+
+
+async def test_state_is_replaced_per_update(simulator):
+    """Test every update creates a new immutable state with a new generation."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    state = easyConnector.state
+    assert state.generation == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        state.indoorTemperature = 0
+
+    # nothing changed, the state stays the same
+    await easyConnector.readCurrentData(force=True)
+    assert easyConnector.state is state
+
+    simulator.setValue("IndoorTemperature", 22.0)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.state.generation == 2
+    assert easyConnector.state.indoorTemperature == 22.0
+    assert state.indoorTemperature == 21.5
+
+
+async def test_register_values(simulator):
+    """Test the raw values of the register sensors."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    assert easyConnector.registerValue("SupplyCellTemperature") == 17.0
+    assert easyConnector.registerValue("BoostTimer") == 0
+
+    simulator.setValue("SupplyCellTemperature", 18.0)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.changedRegisters == {"SupplyCellTemperature"}
+    assert easyConnector.registerValue("SupplyCellTemperature") == 18.0
+    assert easyConnector.registerValue("Unknown") is None
+
+
+async def test_stray_frame_does_not_shift_answers(simulator):
+    """Test a frame nobody asked for is not taken as the answer to the next request."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+
+    simulator.garbageRate = 1.0
+    await easyConnector.readCurrentData(force=True)
+    simulator.garbageRate = 0.0
+
+    simulator.setValue("IndoorTemperature", 22.0)
+    await easyConnector.readCurrentData(force=True)
+    await easyConnector.close()
+
+    assert easyConnector.IndoorTemperature == 22.0
+
+
+async def test_apply_settings(simulator):
+    """Test a profile is sent in frames of three registers and checked with one read."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    reads = simulator.reads
+
+    await easyConnector.applySettings(
+        mode=KWLState.Intensive,
+        atHomeFanSpeed=60,
+        intensiveFanSpeed=100,
+        intensiveDuration=datetime.time(0, 45),
+    )
+    await easyConnector.close()
+
+    # the duration goes ahead of the timer which starts the intensive mode
+    assert [len(frame) for frame in simulator.writes] == [3, 2]
+    assert simulator.reads == reads + 1
+    assert simulator.getValue("BoostTimer") == 45
+    assert easyConnector.instanceState is KWLState.Intensive
+    assert easyConnector.AtHomeFanSpeed == 60
+    assert easyConnector.IntensivFanSpeed == 100
+
+
+async def test_apply_settings_is_rolled_back(simulator):
+    """Test a profile the device takes only partly is set back and reported."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    simulator.readOnly.add("AwayFanSpeed")
+
+    with pytest.raises(SettingsNotAppliedError) as raised:
+        await easyConnector.applySettings(atHomeFanSpeed=60, awayFanSpeed=20)
+    await easyConnector.close()
+
+    assert raised.value.registers == ("AwayFanSpeed",)
+    assert simulator.getValue("AtHomeFanSpeed") == 50
+    assert simulator.getValue("AwayFanSpeed") == 30
+
+
+async def test_apply_settings_is_rolled_back_after_failed_frame(simulator):
+    """Test the frames acknowledged before a failed frame are set back."""
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+    before = {
+        name: simulator.getValue(name)
+        for name in (
+            "IntensivDuration",
+            "AtHomeFanSpeed",
+            "AwayFanSpeed",
+            "IntensivFanSpeed",
+        )
+    }
+
+    writeRegisters = easyConnector.writeRegisters
+    frames = []
+
+    async def loseSecondFrame(writes):
+        frames.append(writes)
+        if len(frames) == 2:
+            raise ConnectionError("frame lost")
+        await writeRegisters(writes)
+
+    easyConnector.writeRegisters = loseSecondFrame
+    with pytest.raises(SettingsNotAppliedError):
+        await easyConnector.applySettings(
+            atHomeFanSpeed=60,
+            awayFanSpeed=20,
+            intensiveFanSpeed=100,
+            intensiveDuration=datetime.time(0, 45),
+        )
+    await easyConnector.close()
+
+    assert [len(frame) for frame in simulator.writes] == [3, 3]
+    assert {name: simulator.getValue(name) for name in before} == before
+
+
+async def test_apply_settings_survives_older_frame(simulator):
+    """Test a poll answered before the profile arrived does not show the old values."""
+    simulator.latency = 0.05
+    easyConnector = createInstance(simulator)
+    await easyConnector.readCurrentData()
+
+    # the poll holds the connection, the profile has to wait for the old frame
+    poll = asyncio.create_task(easyConnector.readCurrentData(force=True))
+    await asyncio.sleep(0.01)
+    applying = asyncio.create_task(easyConnector.applySettings(atHomeFanSpeed=77))
+    await poll
+    assert easyConnector.AtHomeFanSpeed == 77
+    await applying
+    await easyConnector.close()
+
+    assert simulator.getValue("AtHomeFanSpeed") == 77
+
+
+async def test_in_flight_write_survives_older_frame(simulator):
+    """Test a read answered before a write arrived does not show the old value again."""
+    simulator.latency = 0.05
+    easyConnector = EasyControls3Instance(
+        "127.0.0.1", writeCoalesceWindow=0, port=simulator.port
+    )
+    await easyConnector.readCurrentData()
+
+    shown = []
+    easyConnector.addStateListener(lambda: shown.append(easyConnector.AtHomeFanSpeed))
+    # the poll holds the connection, the write has to wait for the old frame
+    poll = asyncio.create_task(easyConnector.readCurrentData(force=True))
+    await asyncio.sleep(0.01)
+    await asyncio.gather(poll, easyConnector.setAtHomeFanSpeed(77))
+    assert easyConnector.AtHomeFanSpeed == 77
+    await easyConnector._flushTask
+    await easyConnector.close()
+
+    assert easyConnector.AtHomeFanSpeed == 77
+    assert 50 not in shown
@@ -0,0 +1,58 @@
+"""Test the registers are read from the bytes the integration always read them from."""
+
+from custom_components.EasyControls3_homeassistant.RegisterMap import STATUS_DECODER
+
+# every byte differs from its neighbours, so a register one byte off gets another value
+FRAME = bytes((index * 37 + 11) & 0xFF for index in range(STATUS_DECODER.frameSize))
+
+
+def word(data, register):
+    return data[register * 2] << 8 | data[register * 2 + 1]
+
+
+def celsius(data, register):
+    return round(word(data, register) / 100 - 273.15, 1)
+
+
+def test_status_registers_match_the_byte_positions():
+    data = FRAME
+    values = STATUS_DECODER.decode(data)
+
+    expected = {
+        "SerialNR": data[28] << 24 | data[29] << 16 | data[30] << 8 | data[31],
+        "DeviceType": data[33],
+        "DeviceModel": data[35],
+        "CurrentFanSpeed": data[129],
+        "AwayFanSpeed": data[407],
+        "AtHomeFanSpeed": data[419],
+        "IntensivFanSpeed": data[431],
+        "IndoorTemperature": celsius(data, 65),
+        "ExhaustTemperature": celsius(data, 66),
+        "OutsideTemperature": celsius(data, 67),
+        "SupplyCellTemperature": celsius(data, 68),
+        "SupplyTemperature": celsius(data, 69),
+        "AirRH": data[149],
+        "CO2Value": data[182] << 8 | data[183],
+        "CycleState": data[215],
+        "CycleMode": data[217],
+        "FilterInterval": data[479],
+        "FilterChangedDay": data[497],
+        "FilterChangedMonth": data[499],
+        "FilterChangedYear": data[501],
+    }
+    assert {name: values[name] for name in expected} == expected
+
+    # the timers and the duration are whole words, of which only the lower
+    # byte used to be read (durations go up to 1440 minutes)
+    assert values["BoostTimer"] == word(data, 110)
+    assert values["BoostTimer"] & 0xFF == data[221]
+    assert values["FireplaceTimer"] == word(data, 111)
+    assert values["FireplaceTimer"] & 0xFF == data[223]
+    assert values["IntensivDuration"] == word(data, 246)
+    assert values["IntensivDuration"] & 0xFF == data[493]
+
+    assert set(values) == set(expected) | {
+        "BoostTimer",
+        "FireplaceTimer",
+        "IntensivDuration",
+    }
@@ -0,0 +1,68 @@
+"""Test the shared poll schedule."""
+
+import asyncio
+from datetime import timedelta
+
+from custom_components.EasyControls3_homeassistant.PollScheduler import PollScheduler
+
+
+def maxConcurrent(log):
+    running = 0
+    maxRunning = 0
+    for _, _, event in sorted(log, key=lambda entry: entry[1]):
+        running += 1 if event == "start" else -1
+        maxRunning = max(maxRunning, running)
+    return maxRunning
+
+
+class FakeCoordinator:
+    def __init__(self, name, log, interval=0.4):
+        self.name = name
+        self.pollInterval = timedelta(seconds=interval)
+        self.lastCycleTime = None
+        self._log = log
+
+    async def async_refresh(self):
+        loop = asyncio.get_running_loop()
+        self._log.append((self.name, loop.time(), "start"))
+        await asyncio.sleep(0.05)
+        self._log.append((self.name, loop.time(), "end"))
+
+
+async def test_polls_are_staggered_and_bounded(hass):
+    """Test the devices are polled one after the other, not all at once."""
+    log = []
+    scheduler = PollScheduler(hass, maxConcurrentPolls=2)
+    coordinators = [FakeCoordinator(f"device {index}", log) for index in range(4)]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+
+    await asyncio.sleep(0.85)
+    for coordinator in coordinators:
+        scheduler.unregister(coordinator)
+    assert scheduler.isEmpty
+
+    starts = [time for _, time, event in log if event == "start"]
+    # every device was polled about twice, 0.1s apart from each other
+    assert 7 <= len(starts) <= 9
+    assert min(b - a for a, b in zip(starts, starts[1:])) > 0.07
+    assert all(coordinator.lastCycleTime >= 0.05 for coordinator in coordinators)
+    assert maxConcurrent(log) == 1
+
+
+async def test_concurrent_polls_are_limited(hass):
+    """Test no more than maxConcurrentPolls devices are read at the same time."""
+    log = []
+    scheduler = PollScheduler(hass, maxConcurrentPolls=2)
+    coordinators = [
+        FakeCoordinator(f"device {index}", log, interval=0.01) for index in range(5)
+    ]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+
+    await asyncio.sleep(0.3)
+    for coordinator in coordinators:
+        scheduler.unregister(coordinator)
+
+    assert len(log) > 10
+    assert maxConcurrent(log) == 2
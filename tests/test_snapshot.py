@@ -0,0 +1,126 @@
+"""Test the device snapshot which is shown right after a restart."""
+
+from datetime import timedelta
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.EasyControls3_homeassistant.coordinator import (
+    SNAPSHOT_SAVE_DELAY,
+    EasyControls3Coordinator,
+)
+from custom_components.EasyControls3_homeassistant.DemandControl import DemandControl
+from custom_components.EasyControls3_homeassistant.EasyControls3Instance import (
+    EasyControls3Instance,
+)
+
+STORAGE_KEY = "EasyControls3_homeassistant.test"
+
+
+async def test_snapshot_is_restored(hass, hass_storage, simulator):
+    """Test the values read before are shown without contacting the device."""
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    coordinator = EasyControls3Coordinator(
+        hass, easyConnector, snapshotStore=Store(hass, 1, STORAGE_KEY)
+    )
+    await coordinator.async_refresh()
+    await easyConnector.close()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["serialNR"] == 4711
+
+    reads = simulator.reads
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    coordinator = EasyControls3Coordinator(
+        hass, easyConnector, snapshotStore=Store(hass, 1, STORAGE_KEY)
+    )
+    assert await coordinator.restoreSnapshot()
+    await easyConnector.close()
+
+    assert simulator.reads == reads
+    assert easyConnector.serialNR == 4711
+    assert easyConnector.IndoorTemperature == 21.5
+    assert coordinator.data is easyConnector
+
+
+async def test_invalid_snapshot(hass, hass_storage):
+    """Test a damaged snapshot is ignored."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {"serialNR": 4711, "frame": "00ff"},
+    }
+    coordinator = EasyControls3Coordinator(
+        hass,
+        EasyControls3Instance("127.0.0.1"),
+        snapshotStore=Store(hass, 1, STORAGE_KEY),
+    )
+    assert not await coordinator.restoreSnapshot()
+
+
+async def test_other_device_after_restart(hass, hass_storage, simulator, caplog):
+    """Test a device swapped behind the same host is noticed with the first read."""
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    await easyConnector.readCurrentData()
+    await easyConnector.close()
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {"serialNR": 4711, "frame": easyConnector.lastFrame.hex()},
+    }
+
+    simulator.setValue("SerialNR", 4712)
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    coordinator = EasyControls3Coordinator(
+        hass, easyConnector, snapshotStore=Store(hass, 1, STORAGE_KEY)
+    )
+    assert await coordinator.restoreSnapshot()
+    assert "is the device" not in caplog.text
+    await coordinator.async_refresh()
+    await easyConnector.close()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+    assert easyConnector.serialNR == 4712
+    assert "is the device 4712 now" in caplog.text
+    assert hass_storage[STORAGE_KEY]["data"]["serialNR"] == 4712
+
+
+async def test_demand_is_resumed_after_restart(hass, hass_storage, simulator):
+    """Test the fan speed raised before a restart is set back when the demand ends."""
+    simulator.setValue("AtHomeFanSpeed", 80)
+    easyConnector = EasyControls3Instance("127.0.0.1", port=simulator.port)
+    await easyConnector.readCurrentData()
+    await easyConnector.close()
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "serialNR": 4711,
+            "frame": easyConnector.lastFrame.hex(),
+            "demand": [50, 80],
+        },
+    }
+
+    easyConnector = EasyControls3Instance(
+        "127.0.0.1", writeCoalesceWindow=0.01, port=simulator.port
+    )
+    easyConnector.setDemandControl(DemandControl(minInterval=0))
+    coordinator = EasyControls3Coordinator(
+        hass, easyConnector, snapshotStore=Store(hass, 1, STORAGE_KEY)
+    )
+    assert await coordinator.restoreSnapshot()
+    assert easyConnector.demandRaisedFanSpeeds == (50, 80)
+
+    await coordinator.async_refresh()
+    await easyConnector._demandControlTask
+    await coordinator.saveSnapshot()
+    await easyConnector.close()
+
+    assert simulator.getValue("AtHomeFanSpeed") == 50
+    assert hass_storage[STORAGE_KEY]["data"]["demand"] is None
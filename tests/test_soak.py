@@ -0,0 +1,30 @@
+"""Run a short soak test with injected faults."""
+
+import asyncio
+import logging
+import sys
+
+from .soak import SoakSettings, runSoak
+
+# tracing for the coverage report makes everything a lot slower
+LIMIT_FACTOR = 5 if sys.gettrace() is not None else 1
+
+
+def test_soak_with_faults(socket_enabled, caplog):
+    # the failing reads are expected, their logging would only slow the loop down
+    caplog.set_level(logging.CRITICAL)
+    settings = SoakSettings(
+        devices=5,
+        duration=4,
+        window=1,
+        pollInterval=0.1,
+        faultInterval=0.3,
+        faultDuration=0.5,
+        timeout=0.2,
+        maxLag=0.1 * LIMIT_FACTOR,
+    )
+    # an own event loop, the one of the hass fixture runs in (slow) debug mode
+    result = asyncio.run(runSoak(settings, report=lambda window: None))
+
+    assert sum(result.faults.values()) >= 10
+    assert not result.problems
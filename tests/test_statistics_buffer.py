@@ -0,0 +1,53 @@
+"""Test the hourly statistics which are imported into the recorder."""
+
+import random
+
+from custom_components.EasyControls3_homeassistant.StatisticsBuffer import (
+    PeriodStatistic,
+    StatisticsBuffer,
+)
+
+
+def test_periods_are_handed_out_once_complete():
+    buffer = StatisticsBuffer()
+    buffer.add("sensor.co2", 3600, 500)
+    buffer.add("sensor.co2", 5000, 700)
+    buffer.add("sensor.co2", 7199, 600)
+    assert buffer.popCompleted(7199) == {}
+
+    buffer.add("sensor.co2", 7200, 900)
+    assert buffer.popCompleted(7200) == {
+        "sensor.co2": [PeriodStatistic(3600, 600.0, 500, 700, 3)]
+    }
+    # handed out only once, the next period is still open
+    assert buffer.popCompleted(7200) == {}
+    assert buffer.popCompleted(10800) == {
+        "sensor.co2": [PeriodStatistic(7200, 900.0, 900, 900, 1)]
+    }
+
+
+def test_statistics_match_readings():
+    generator = random.Random(5)
+    buffer = StatisticsBuffer(period=600)
+    readings = {}
+    for timestamp in range(0, 6000, 7):
+        value = generator.uniform(15, 25)
+        buffer.add("sensor.indoor", timestamp, value)
+        readings.setdefault(timestamp - timestamp % 600, []).append(value)
+
+    periods = buffer.popCompleted(6000)["sensor.indoor"]
+    assert [period.start for period in periods] == sorted(readings)
+    for period in periods:
+        values = readings[period.start]
+        assert period.count == len(values)
+        assert period.minimum == min(values)
+        assert period.maximum == max(values)
+        assert abs(period.mean - sum(values) / len(values)) < 1e-9
+
+
+def test_discarded_statistics_are_not_imported():
+    buffer = StatisticsBuffer()
+    buffer.add("sensor.rh", 0, 50)
+    buffer.add("sensor.co2", 0, 500)
+    buffer.discard("sensor.rh")
+    assert list(buffer.popCompleted(3600)) == ["sensor.co2"]
@@ -0,0 +1,52 @@
+"""Test the texts of the config and options flow are complete."""
+
+import json
+import pathlib
+
+from custom_components.EasyControls3_homeassistant import const
+
+COMPONENT = pathlib.Path(const.__file__).parent
+
+
+def load(name):
+    return json.loads((COMPONENT / name).read_text())
+
+
+def keys(texts, prefix=""):
+    for key, value in texts.items():
+        if isinstance(value, dict):
+            yield from keys(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}"
+
+
+def test_english_translation_matches_strings():
+    assert set(keys(load("translations/en.json"))) == set(keys(load("strings.json")))
+
+
+def test_flow_texts():
+    english = load("translations/en.json")
+    config = english["config"]
+    assert set(config["step"]) == {
+        "user",
+        "manual",
+        "discovery",
+        "pick",
+        "discovery_confirm",
+    }
+    assert set(config["step"]["user"]["menu_options"]) == {"manual", "discovery"}
+    description = config["step"]["discovery_confirm"]["description"]
+    assert all(f"{{{name}}}" in description for name in ("model", "serial", "host"))
+    assert set(config["error"]) == {
+        "invalid_network",
+        "no_devices_found",
+        "cannot_connect",
+        "unknown",
+    }
+    assert set(config["abort"]) == {"already_configured"}
+
+    options = english["options"]
+    assert set(options["step"]["init"]["data"]) == {
+        value for name, value in vars(const).items() if name.startswith("CONF_")
+    }
+    assert set(options["error"]) == {"invalid_interval", "invalid_threshold"}